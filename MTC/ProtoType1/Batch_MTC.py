@@ -0,0 +1,266 @@
+# ==============================================================================
+# BATCH MTC GENERATION
+# Turns whole folders of micro / tensile / hardness reports into one MTC per
+# heat, fanning the extractors out over a process pool.
+# ==============================================================================
+
+import os
+import re
+import copy
+import time
+import shutil
+import zipfile
+from io import BytesIO
+from concurrent.futures import as_completed
+
+from Working import (
+    cached_extract,
+    extract_micro_data_from_docx,
+    process_tensile_file,
+    process_hardness_file,
+    update_excel_mtc,
+    mtc_cell_values,
+    record_history,
+)
+from Report_Index import ReportIndex
+from Xlsx_Patch_Writer import strip_illegal_chars
+from Report_Mirror import sync_reports
+from Isolated_Pool import IsolatedPool, DEFAULT_TIMEOUT
+from Stage_Timing import TIMINGS, span, call_with_spans, export_timings, summarize
+
+SHEET_TITLE_INVALID = re.compile(r"[\[\]:*?/\\]")
+SHEET_TITLE_MAX = 31
+PICTURE_PATTERN = re.compile(rb"<(?:\w+:)?pic[\s>]")
+
+def pair_reports(micro_dir, tensile_dir, hardness_dir):
+    """
+    Groups the three report folders by heat.
+    Returns (complete, incomplete): complete maps heat -> (micro, tensile, hardness),
+    incomplete maps heat -> list of missing report kinds.
+    """
+    return ReportIndex(micro_dir, tensile_dir, hardness_dir).pair()
+
+
+def write_heat_mtc(heat, template_path, output_dir, micro_data, tensile_data, hardness_data, writer="openpyxl",
+                   sources=None, origin="batch"):
+    """ Copies the blank template for one heat and fills it. Returns the output path. """
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"MTC_{heat}.xlsx")
+    shutil.copyfile(template_path, output_path)
+    update_excel_mtc(output_path, micro_data, tensile_data, hardness_data, writer=writer, sources=sources, origin=origin)
+    return output_path
+
+
+def sheet_title(heat, taken):
+    """ Excel sheet name for a heat: no []:*?/\\, at most 31 characters, unique (case-insensitive) in taken. """
+    base = SHEET_TITLE_INVALID.sub("_", heat).strip("'")[:SHEET_TITLE_MAX] or "MTC"
+    title, n = base, 1
+    while title.lower() in taken:
+        n += 1
+        suffix = f" ({n})"
+        title = base[:SHEET_TITLE_MAX - len(suffix)] + suffix
+    taken.add(title.lower())
+    return title
+
+
+def template_picture_count(template_path):
+    """ Pictures placed in the template's drawings, i.e. the images openpyxl should have loaded. """
+    with zipfile.ZipFile(template_path) as xlsx:
+        return sum(len(PICTURE_PATTERN.findall(xlsx.read(name))) for name in xlsx.namelist()
+                   if name.startswith("xl/drawings/") and name.endswith(".xml"))
+
+
+def copy_images(images, target):
+    """ Places a copy of every (image, bytes) pair (logos, signatures) on target at the same anchor. """
+    from openpyxl.drawing.image import Image
+    for image, data in images:
+        clone = Image(BytesIO(data))
+        clone.width, clone.height = image.width, image.height
+        clone.anchor = copy.deepcopy(image.anchor)
+        target.add_image(clone)
+
+
+def write_shipment_mtc(template_path, output_path, heat_results, heat_sources=None, origin="shipment", logger=None):
+    """
+    Writes several heats into one workbook with a single load and a single save:
+    the template sheet is cloned once per heat (named after the heat, in the order
+    given), each clone is filled, and the blank template sheet is dropped.
+    heat_results maps heat -> (micro, tensile, hardness); heat_sources maps heat ->
+    {kind: report path} for the MTC history. Clones keep values, styles, merged
+    cells, sizes, page setup and the template's images at their anchors.
+    Raises ValueError rather than write certificates that would lose a picture
+    openpyxl couldn't load (Pillow missing, WMF) or a chart. Returns output_path.
+    """
+    import openpyxl
+    if not heat_results: raise ValueError("No heats to write")
+    with span("workbook_load", template_path):
+        wb = openpyxl.load_workbook(template_path)
+    template = wb.active
+    loaded = sum(len(ws._images) for ws in wb.worksheets)
+    pictures = template_picture_count(template_path)
+    if loaded < pictures:
+        raise ValueError(f"Template has {pictures} pictures but only {loaded} could be loaded "
+                         "(install Pillow; WMF images are not supported); shipment not written")
+    if template._charts: raise ValueError("Template sheet has charts, which can't be cloned per heat")
+    images = [(image, image._data()) for image in template._images]  # _data() consumes the image's stream
+    taken = {ws.title.lower() for ws in wb.worksheets if ws is not template}
+    for heat, (micro_data, tensile_data, hardness_data) in heat_results.items():
+        ws = wb.copy_worksheet(template)
+        ws.title = sheet_title(heat, taken)
+        copy_images(images, ws)
+        for cell, value, _ in mtc_cell_values(micro_data, tensile_data, hardness_data):
+            ws[cell] = strip_illegal_chars(value)
+    wb.remove(template)
+    wb.active = len(wb.worksheets) - len(heat_results)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with span("workbook_save", output_path, sheets=len(heat_results)):
+        wb.save(output_path)
+    for heat, sources in (heat_sources or {}).items():
+        record_history(output_path, *heat_results[heat], sources, origin, logger)
+    return output_path
+
+
+def build_shipment_mtc(heats, template_path, output_path, logger=None):
+    """
+    One workbook for a shipment: heats maps heat -> (micro, tensile, hardness) report
+    paths, filled from the extraction cache (run_batch's pool has just parsed every
+    report into it; a report missing from the cache is parsed here).
+    """
+    results, sources = {}, {}
+    for heat, (micro_path, tensile_path, hardness_path) in heats.items():
+        results[heat] = (cached_extract(extract_micro_data_from_docx, micro_path),
+                         cached_extract(process_tensile_file, tensile_path),
+                         cached_extract(process_hardness_file, hardness_path))
+        sources[heat] = {"micro": micro_path, "tensile": tensile_path, "hardness": hardness_path}
+    return write_shipment_mtc(template_path, output_path, results, sources, logger=logger)
+
+
+def build_heat_mtc(heat, micro_path, tensile_path, hardness_path, template_path, output_dir,
+                   use_cache=True, writer="openpyxl", origin="batch"):
+    """ Extracts the three reports of one heat and writes its MTC (runs inside a worker process). """
+    extract = cached_extract if use_cache else (lambda extractor, path: extractor(path))
+    micro_data = extract(extract_micro_data_from_docx, micro_path)
+    tensile_data = extract(process_tensile_file, tensile_path)
+    hardness_data = extract(process_hardness_file, hardness_path)
+    sources = {"micro": micro_path, "tensile": tensile_path, "hardness": hardness_path}
+    return write_heat_mtc(heat, template_path, output_dir, micro_data, tensile_data, hardness_data, writer,
+                          sources, origin)
+
+
+def run_batch(micro_dir, tensile_dir, hardness_dir, template_path, output_dir, workers=None, logger=print,
+              use_cache=True, writer="openpyxl", mirror_dir=None, timeout=DEFAULT_TIMEOUT, shipment=None):
+    """
+    Extracts every paired heat in parallel and writes each MTC as soon as its
+    three reports are parsed. Returns a summary dict (written, failed, skipped, timing).
+    use_cache=False re-parses every report instead of reusing cached results;
+    writer="patch" fills each MTC through the xlsx patch writer;
+    mirror_dir copies the report folders to that local directory before extracting;
+    a report whose extraction runs past timeout seconds is killed and fails only its heat;
+    shipment names one workbook (in output_dir) that receives every heat as its own
+    sheet, saved once at the end, instead of one MTC file per heat; the pool then
+    always extracts through the cache (use_cache=False refreshes the entries) and
+    build_shipment_mtc fills the sheets from it.
+    """
+    def log(msg):
+        if logger: logger(msg)
+
+    if not os.path.exists(template_path): raise FileNotFoundError("MTC template not found")
+    os.makedirs(output_dir, exist_ok=True)
+
+    if mirror_dir:
+        (micro_dir, tensile_dir, hardness_dir), _ = sync_reports(micro_dir, tensile_dir, hardness_dir,
+                                                                 mirror_dir, logger)
+
+    complete, incomplete = pair_reports(micro_dir, tensile_dir, hardness_dir)
+    for heat, missing in incomplete.items():
+        log(f"[SKIP] {heat}: missing {', '.join(missing)} report")
+
+    workers = workers or os.cpu_count() or 1
+    log(f"--- Batch: {len(complete)} heats on {workers} workers ---")
+
+    written, failed = [], {}
+    pending = {heat: {} for heat in complete}
+    shipment_heats = []
+    start = time.perf_counter()
+
+    with IsolatedPool(workers, timeout=timeout) as pool:
+        futures = {}
+        for heat, (micro_path, tensile_path, hardness_path) in complete.items():
+            for kind, extractor, path in (("micro", extract_micro_data_from_docx, micro_path),
+                                          ("tensile", process_tensile_file, tensile_path),
+                                          ("hardness", process_hardness_file, hardness_path)):
+                if shipment:
+                    future = pool.submit(call_with_spans, cached_extract, extractor, path, bypass_cache=not use_cache)
+                elif use_cache: future = pool.submit(call_with_spans, cached_extract, extractor, path)
+                else: future = pool.submit(call_with_spans, extractor, path)
+                futures[future] = (heat, kind, path)
+
+        for future in as_completed(futures):
+            heat, kind, path = futures[future]
+            if heat in failed: continue
+            try:
+                pending[heat][kind], spans = future.result()
+                TIMINGS.extend(spans)
+            except Exception as e:
+                failed[heat] = f"{kind} extraction ({os.path.basename(path)}): {type(e).__name__}: {e}"
+                log(f"[FAIL] {heat}: {failed[heat]}")
+                continue
+
+            if len(pending[heat]) < 3: continue
+            results = pending.pop(heat)
+            if shipment:
+                shipment_heats.append(heat)
+                continue
+            try:
+                micro_path, tensile_path, hardness_path = complete[heat]
+                path = write_heat_mtc(heat, template_path, output_dir,
+                                      results["micro"], results["tensile"], results["hardness"], writer,
+                                      {"micro": micro_path, "tensile": tensile_path, "hardness": hardness_path})
+                written.append(path)
+                log(f"[DONE] {heat} -> {os.path.basename(path)}")
+            except Exception as e:
+                failed[heat] = f"write: {e}"
+                log(f"[FAIL] {heat}: {failed[heat]}")
+
+    if shipment and shipment_heats:
+        heats = sorted(shipment_heats)
+        try:
+            path = build_shipment_mtc({heat: complete[heat] for heat in heats}, template_path,
+                                      os.path.join(output_dir, shipment), logger=logger)
+            written.extend(heats)
+            log(f"[DONE] {len(heats)} heats -> {os.path.basename(path)}")
+        except Exception as e:
+            for heat in heats: failed[heat] = f"shipment write: {e}"
+            log(f"[FAIL] {shipment}: {e}")
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "heats": len(complete),
+        "written": len(written),
+        "failed": failed,
+        "skipped": incomplete,
+        "seconds": round(elapsed, 2),
+        "heats_per_minute": round(len(written) / elapsed * 60, 1) if elapsed > 0 else 0.0,
+    }
+    log("-" * 40)
+    log(f"Written: {summary['written']}/{summary['heats']}  Failed: {len(failed)}  Skipped: {len(incomplete)}")
+    log(f"Time: {summary['seconds']}s  ({summary['heats_per_minute']} MTC/min)")
+    for line in summarize(): log(f"   {line}")
+    export_timings(logger=logger)
+    return summary
+
+
+# ==============================================================================
+# MAIN ENTRY POINT
+# ==============================================================================
+
+if __name__ == "__main__":
+    BASE = "/home/johnny/MTCAUTO/MTCAUTO"
+    run_batch(
+        os.path.join(BASE, "MICRO_REPORT"),
+        os.path.join(BASE, "TENCILE_OG"),
+        os.path.join(BASE, "HARDNESS_OG"),
+        os.path.join(BASE, "play_MTC.xlsx"),
+        os.path.join(BASE, "MTC_OUTPUT"),
+    )
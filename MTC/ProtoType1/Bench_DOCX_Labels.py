@@ -0,0 +1,67 @@
+# ==============================================================================
+# BENCHMARK: DOCX LABEL LOOKUP
+# Compares the old per-label rescan of all_text_chunks with the single-pass
+# index_label_positions() on synthetic micro reports of growing size.
+# ==============================================================================
+
+import random
+import time
+
+from Working import MICRO_TARGET_LABELS
+from Extraction_Rules import index_label_positions
+
+FILLER_WORDS = "sample taken from casting section polished etched observed at 100x magnification".split()
+
+
+def make_chunks(size, seed=1):
+    """ Builds a chunk list with every label near the start and again near the end. """
+    rng = random.Random(seed)
+    chunks = [" ".join(rng.choices(FILLER_WORDS, k=rng.randint(1, 6))) for _ in range(size)]
+    for offset, label in enumerate(MICRO_TARGET_LABELS):
+        chunks[10 + offset * 7] = label
+        chunks[size - 60 + offset * 7] = label
+    return chunks
+
+
+def rescan_positions(chunks):
+    """ The original lookup: one full pass and two lower() calls per chunk, per label. """
+    positions = {}
+    for label, preference in MICRO_TARGET_LABELS.items():
+        target_index = -1
+        if preference == "last":
+            for i, chunk in enumerate(chunks):
+                if label.lower() in chunk.lower(): target_index = i
+        elif preference == "first":
+            for i, chunk in enumerate(chunks):
+                if label.lower() in chunk.lower():
+                    target_index = i
+                    break
+        if target_index != -1: positions[label] = target_index
+    return positions
+
+
+def indexed_positions(chunks):
+    positions = {}
+    for label, (first_index, last_index) in index_label_positions(chunks, MICRO_TARGET_LABELS).items():
+        positions[label] = last_index if MICRO_TARGET_LABELS[label] == "last" else first_index
+    return positions
+
+
+def best_of(func, chunks, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(chunks)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best: best = elapsed
+    return best
+
+
+if __name__ == "__main__":
+    print(f"{'chunks':>10} {'rescan ms':>12} {'index ms':>12} {'speedup':>9}")
+    for size in (1_000, 10_000, 100_000, 500_000):
+        chunks = make_chunks(size)
+        assert rescan_positions(chunks) == indexed_positions(chunks)
+        old = best_of(rescan_positions, chunks)
+        new = best_of(indexed_positions, chunks)
+        print(f"{size:>10} {old * 1000:>12.2f} {new * 1000:>12.2f} {old / new:>8.1f}x")
@@ -0,0 +1,99 @@
+# ==============================================================================
+# BENCHMARK: HARDNESS LABEL / HBW MATCHING
+# Compares the original per-label scan of every element (regex inside the inner
+# loop), the PageIndex row lookup, and the NumPy batch match on synthetic dense
+# hardness-mapping pages with hundreds of indentations.
+# ==============================================================================
+
+import re
+import random
+import time
+
+import Extraction_Rules
+from Extraction_Rules import DEFAULT_RULES, PageIndex, numpy_module
+from Working import TextLine
+
+FILLER_WORDS = "sample casting section polished etched indentation ball load 3000 kgf dwell".split()
+
+
+def make_page(readings, filler=300, seed=1):
+    """ Hardness rows in column pairs (label, value) plus filler lines, as TextLine records. """
+    rng = random.Random(seed)
+    elements = []
+    per_column = 60
+    for n in range(readings):
+        column, row = divmod(n, per_column)
+        x, y = 30 + column * 140, 740 - row * 11
+        elements.append(TextLine(f"Hardness {n + 1}\n", (x, y, x + 45, y + 9)))
+        value = f"{rng.uniform(2.1, 2.6):.3f} mm {rng.uniform(160, 230):.1f} HBW\n"
+        elements.append(TextLine(value, (x + 55, y, x + 130, y + 9)))
+    for _ in range(filler):
+        x, y = rng.uniform(20, 500), rng.uniform(20, 740)
+        elements.append(TextLine(" ".join(rng.choices(FILLER_WORDS, k=4)) + "\n", (x, y, x + 90, y + 9)))
+    rng.shuffle(elements)
+    return elements
+
+
+def original_match(elements):
+    """ The original loop: every label scans every element and re-runs the HBW regex. """
+    labels = [e for e in elements if "Hardness" in e.get_text()]
+    labels.sort(key=lambda x: x.bbox[3], reverse=True)
+    values = []
+    for label in labels:
+        lx0, ly0, lx1, ly1 = label.bbox
+        found_val = None
+        match_inside = re.search(r"([\d\.]+)\s*HBW", label.get_text().strip())
+        if match_inside: found_val = match_inside.group(1)
+        if not found_val:
+            closest_dist = 9999
+            for element in elements:
+                etext = element.get_text().strip()
+                ex0, ey0, ex1, ey1 = element.bbox
+                if "HBW" not in etext: continue
+                if (ey0 < ly1 + 5) and (ey1 > ly0 - 5) and (ex0 > lx0):
+                    dist = ex0 - lx1
+                    if dist < closest_dist:
+                        n_match = re.search(r"([\d\.]+)\s*HBW", etext)
+                        if n_match:
+                            closest_dist = dist
+                            found_val = n_match.group(1)
+        if found_val: values.append(found_val)
+    return values
+
+
+def rule_match(elements, vector_min_labels):
+    Extraction_Rules.VECTOR_MIN_LABELS = vector_min_labels
+    return DEFAULT_RULES.hardness.apply(PageIndex(elements))["BHN"]
+
+
+def row_lookup(elements):
+    return rule_match(elements, float("inf"))
+
+
+def batch_match(elements):
+    return rule_match(elements, 0)
+
+
+def best_of(func, elements, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(elements)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best: best = elapsed
+    return best
+
+
+if __name__ == "__main__":
+    has_numpy = numpy_module() is not None
+    if not has_numpy: print("NumPy not installed: batch column repeats the row lookup\n")
+    print(f"{'readings':>9} {'original ms':>12} {'rows ms':>9} {'batch ms':>9} {'speedup':>8}")
+    for readings in (2, 50, 200, 500):
+        elements = make_page(readings)
+        expected = original_match(elements)
+        assert len(expected) == readings
+        assert row_lookup(elements) == expected and batch_match(elements) == expected
+        old = best_of(original_match, elements)
+        rows = best_of(row_lookup, elements)
+        batch = best_of(batch_match, elements)
+        print(f"{readings:>9} {old * 1000:>12.2f} {rows * 1000:>9.2f} {batch * 1000:>9.2f} {old / min(rows, batch):>7.1f}x")
@@ -0,0 +1,191 @@
+# ==============================================================================
+# PIPELINE BENCHMARK
+# Generates a synthetic corpus, times every stage (DOCX, tensile PDF, hardness
+# PDF, Excel write) in each of its modes plus the full per-heat pipeline, and
+# writes latency / throughput / peak memory to a JSON file for run-to-run
+# comparison. Peak memory is Python heap as seen by tracemalloc.
+#
+#   python Bench_Pipeline.py --heats 20 --appendix-chunks 5000 --out bench.json
+# ==============================================================================
+
+import os
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+from datetime import datetime
+
+from Working import (
+    EXTRACTOR_RULES_VERSION,
+    extract_micro_data_from_docx,
+    process_tensile_file,
+    process_hardness_file,
+    update_excel_mtc,
+)
+from Report_Index import ReportIndex
+from Synthetic_Corpus import generate_corpus
+
+
+def measure(func, inputs, repeat):
+    """ Runs func over every input `repeat` times; returns latency stats, throughput and peak memory. """
+    latencies = []
+    total_bytes = sum(os.path.getsize(path) for path in inputs)
+    peak = 0
+    for _ in range(repeat):
+        for path in inputs:
+            tracemalloc.start()
+            start = time.perf_counter()
+            func(path)
+            latencies.append(time.perf_counter() - start)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    total_time = sum(latencies)
+    return {
+        "files": len(inputs),
+        "runs": len(latencies),
+        "latency_ms": {
+            "median": round(statistics.median(latencies) * 1000, 3),
+            "min": round(min(latencies) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+        "files_per_second": round(len(latencies) / total_time, 2) if total_time else None,
+        "mb_per_second": round(total_bytes * repeat / (1024 * 1024) / total_time, 2) if total_time else None,
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+SAMPLE_MICRO = {"Graphite Nodularity": "85%", "Nodular Particles per mm²": "150", "Graphite Size": "6",
+                "Graphite Form": "VI (90%)", "Graphite Fraction": "10%", "Ferrite / Pearlite Ratio": "70%/30%"}
+
+
+def measure_excel(template_path, work_dir, writer, repeat):
+    """ Excel stage on a fresh template copy per run (copy time excluded). """
+    target = os.path.join(work_dir, f"bench_{writer}.xlsx")
+    latencies, peak = [], 0
+    for _ in range(repeat):
+        shutil.copyfile(template_path, target)
+        tracemalloc.start()
+        start = time.perf_counter()
+        update_excel_mtc(target, SAMPLE_MICRO, ("520", "340", "12.5"), ["172.9", "180.1"], writer=writer)
+        latencies.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        "runs": repeat,
+        "latency_ms": {
+            "median": round(statistics.median(latencies) * 1000, 3),
+            "min": round(min(latencies) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+        "files_per_second": round(repeat / sum(latencies), 2),
+        "template_kb": round(os.path.getsize(template_path) / 1024, 1),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def measure_pipeline(pairs, template_path, work_dir, fast_layout, writer):
+    """ Sequential end-to-end run: three extractions + one MTC write per heat. """
+    tracemalloc.start()
+    start = time.perf_counter()
+    for heat, (micro, tensile, hardness) in pairs.items():
+        output = os.path.join(work_dir, f"MTC_{heat}.xlsx")
+        shutil.copyfile(template_path, output)
+        update_excel_mtc(output,
+                         extract_micro_data_from_docx(micro),
+                         process_tensile_file(tensile, fast_layout=fast_layout),
+                         process_hardness_file(hardness, fast_layout=fast_layout),
+                         writer=writer)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "heats": len(pairs),
+        "seconds": round(elapsed, 3),
+        "ms_per_heat": round(elapsed / len(pairs) * 1000, 3),
+        "heats_per_minute": round(len(pairs) / elapsed * 60, 1),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(config, repeat=3, logger=print):
+    def log(msg):
+        if logger: logger(msg)
+
+    work_dir = tempfile.mkdtemp(prefix="mtc_bench_")
+    try:
+        log(f"Generating corpus in {work_dir} ...")
+        template_path = generate_corpus(work_dir, **config)
+        index = ReportIndex.for_base(work_dir)
+        pairs, _ = index.pair()
+        micro = [paths[0] for paths in pairs.values()]
+        tensile = [paths[1] for paths in pairs.values()]
+        hardness = [paths[2] for paths in pairs.values()]
+
+        stages = {}
+        for name, func, inputs in (
+                ("docx", extract_micro_data_from_docx, micro),
+                ("docx_streaming", lambda p: extract_micro_data_from_docx(p, streaming=True), micro),
+                ("tensile_full_layout", process_tensile_file, tensile),
+                ("tensile_fast_layout", lambda p: process_tensile_file(p, fast_layout=True), tensile),
+                ("hardness_full_layout", process_hardness_file, hardness),
+                ("hardness_fast_layout", lambda p: process_hardness_file(p, fast_layout=True), hardness)):
+            log(f"Stage {name} ...")
+            stages[name] = measure(func, inputs, repeat)
+        for writer in ("openpyxl", "patch"):
+            log(f"Stage excel_{writer} ...")
+            stages[f"excel_{writer}"] = measure_excel(template_path, work_dir, writer, repeat * len(pairs))
+
+        pipeline = {}
+        for name, fast_layout, writer in (("default", False, "openpyxl"), ("fast", True, "patch")):
+            log(f"Pipeline {name} ...")
+            pipeline[name] = measure_pipeline(pairs, template_path, work_dir, fast_layout, writer)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "extractor_rules_version": EXTRACTOR_RULES_VERSION,
+        "config": dict(config, repeat=repeat),
+        "stages": stages,
+        "pipeline": pipeline,
+    }
+
+
+def print_report(results):
+    print(f"\n{'stage':24} {'median ms':>10} {'files/s':>9} {'peak KB':>9}")
+    for name, stats in results["stages"].items():
+        print(f"{name:24} {stats['latency_ms']['median']:>10.2f} {stats['files_per_second']:>9} {stats['peak_memory_kb']:>9}")
+    for name, stats in results["pipeline"].items():
+        print(f"pipeline {name:15} {stats['ms_per_heat']:>10.2f} ms/heat  {stats['heats_per_minute']} MTC/min")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the MTC extraction pipeline on a synthetic corpus.")
+    parser.add_argument("--heats", type=int, default=10)
+    parser.add_argument("--appendix-chunks", type=int, default=200, help="filler paragraphs per micro DOCX")
+    parser.add_argument("--pdf-filler", type=int, default=150, help="filler text lines per PDF page")
+    parser.add_argument("--hardness-readings", type=int, default=2)
+    parser.add_argument("--pdf-pages", type=int, default=1)
+    parser.add_argument("--results-page", type=int, default=0, help="page holding the PDF result rows")
+    parser.add_argument("--template-rows", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default="bench_results.json", help="JSON file; results are appended as one line per run")
+    args = parser.parse_args()
+
+    config = {
+        "heats": args.heats, "appendix_chunks": args.appendix_chunks, "pdf_filler": args.pdf_filler,
+        "hardness_readings": args.hardness_readings, "pdf_pages": args.pdf_pages,
+        "template_rows": args.template_rows, "results_page": args.results_page,
+    }
+    results = run_benchmarks(config, args.repeat)
+    print_report(results)
+    with open(args.out, "a", encoding="utf-8") as f:
+        f.write(json.dumps(results) + "\n")
+    print(f"\nResults appended to {args.out}")
@@ -0,0 +1,102 @@
+# ==============================================================================
+# BENCHMARK: SHIPMENT WORKBOOK VS ONE FILE PER HEAT
+# Writes N heats from ready extraction results (as the cache returns them) into
+# N separate MTC files (openpyxl and patch writers) and into one consolidated
+# workbook with a sheet per heat, and compares wall time and output size.
+#
+#   python Bench_Shipment_Workbook.py --heats 10 50 200 --template-rows 60
+# ==============================================================================
+
+import os
+import random
+import shutil
+import argparse
+import tempfile
+import time
+
+import openpyxl
+
+from Batch_MTC import write_heat_mtc, write_shipment_mtc
+from Synthetic_Corpus import write_template
+
+
+def heat_results(heats, seed=0):
+    """ heat -> (micro, tensile, hardness) in the shapes the extractors return. """
+    rng = random.Random(seed)
+    results = {}
+    for n in range(heats):
+        ferrite = rng.randint(60, 95)
+        micro = {"Graphite Nodularity": f"{rng.randint(75, 95)}%", "Nodular Particles per mm²": str(rng.randint(120, 220)),
+                 "Graphite Size": str(rng.randint(5, 8)), "Graphite Form": f"VI ({rng.randint(85, 97)}%)",
+                 "Graphite Fraction": f"{rng.randint(8, 14)}%", "Ferrite / Pearlite Ratio": f"{ferrite}%/{100 - ferrite}%"}
+        tensile = (str(rng.randint(400, 600)), str(rng.randint(250, 400)), f"{rng.uniform(8, 22):.1f}")
+        hardness = [f"{rng.uniform(160, 230):.1f}" for _ in range(2)]
+        results[f"F{300 + n}-{n:03d}"] = (micro, tensile, hardness)
+    return results
+
+
+def separate_files(template_path, out_dir, results, writer):
+    for heat, (micro, tensile, hardness) in results.items():
+        write_heat_mtc(heat, template_path, out_dir, micro, tensile, hardness, writer)
+    return [os.path.join(out_dir, f"MTC_{heat}.xlsx") for heat in results]
+
+
+def consolidated(template_path, out_dir, results):
+    return [write_shipment_mtc(template_path, os.path.join(out_dir, "Shipment.xlsx"), results)]
+
+
+def run(folder, func, work_dir, repeat):
+    """ Best wall time over `repeat` runs into a fresh folder; returns (seconds, total bytes, files). """
+    best = None
+    for _ in range(repeat):
+        out_dir = os.path.join(work_dir, folder)
+        shutil.rmtree(out_dir, ignore_errors=True)
+        start = time.perf_counter()
+        paths = func(out_dir)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best: best = elapsed
+    return best, sum(os.path.getsize(path) for path in paths), len(paths)
+
+
+def check_sheets(path, template_path, results):
+    """ Every heat sheet matches the template plus that heat's values. """
+    from Working import mtc_cell_values
+    template = openpyxl.load_workbook(template_path).active
+    wb = openpyxl.load_workbook(path)
+    assert wb.sheetnames == list(results)
+    for heat, values in results.items():
+        expected = {cell: value for cell, value, _ in mtc_cell_values(*values)}
+        ws = wb[heat]
+        assert {str(r) for r in ws.merged_cells.ranges} == {str(r) for r in template.merged_cells.ranges}
+        for row in template.iter_rows():
+            for cell in row:
+                assert ws[cell.coordinate].value == expected.get(cell.coordinate, cell.value), (heat, cell.coordinate)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare one shipment workbook against one MTC file per heat.")
+    parser.add_argument("--heats", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--template-rows", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="mtc_shipment_")
+    template_path = os.path.join(work_dir, "template.xlsx")
+    write_template(template_path, rows=args.template_rows)
+    try:
+        print(f"template {os.path.getsize(template_path) / 1024:.1f} KB, {args.template_rows} rows\n")
+        print(f"{'heats':>6} {'mode':<22} {'wall s':>8} {'ms/heat':>8} {'files':>6} {'size KB':>9}")
+        for heats in args.heats:
+            results = heat_results(heats)
+            modes = [
+                ("separate (openpyxl)", "openpyxl", lambda d: separate_files(template_path, d, results, "openpyxl")),
+                ("separate (patch)", "patch", lambda d: separate_files(template_path, d, results, "patch")),
+                ("one workbook", "shipment", lambda d: consolidated(template_path, d, results)),
+            ]
+            for label, folder, func in modes:
+                seconds, size, files = run(folder, func, work_dir, args.repeat)
+                print(f"{heats:>6} {label:<22} {seconds:>8.3f} {seconds / heats * 1000:>8.1f} {files:>6} {size / 1024:>9.1f}")
+            check_sheets(os.path.join(work_dir, "shipment", "Shipment.xlsx"), template_path, results)
+            print()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
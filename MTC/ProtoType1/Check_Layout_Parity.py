@@ -0,0 +1,55 @@
+# ==============================================================================
+# FAST LAYOUT PARITY CHECK
+# Runs the tensile / hardness extractors on real reports with the full pdfminer
+# layout and with fast_layout=True, and reports any value that differs.
+# Exit code is 1 when at least one report disagrees.
+# ==============================================================================
+
+import os
+import sys
+import time
+
+from Working import process_tensile_file, process_hardness_file
+
+
+def compare_folder(folder, extractor):
+    """ Returns (checked, mismatches, full_seconds, fast_seconds) for every PDF in a folder. """
+    checked, mismatches = 0, []
+    full_time = fast_time = 0.0
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(".pdf"): continue
+        path = os.path.join(folder, name)
+
+        start = time.perf_counter()
+        full = extractor(path)
+        full_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        fast = extractor(path, fast_layout=True)
+        fast_time += time.perf_counter() - start
+
+        checked += 1
+        if full != fast: mismatches.append((name, full, fast))
+    return checked, mismatches, full_time, fast_time
+
+
+def check_parity(tensile_dir, hardness_dir):
+    ok = True
+    for title, folder, extractor in (("Tensile", tensile_dir, process_tensile_file),
+                                     ("Hardness", hardness_dir, process_hardness_file)):
+        if not os.path.isdir(folder):
+            print(f"{title}: folder not found ({folder})")
+            continue
+        checked, mismatches, full_time, fast_time = compare_folder(folder, extractor)
+        print(f"--- {title}: {checked} files, {len(mismatches)} mismatches ---")
+        print(f"Full layout: {full_time:.2f}s   Fast layout: {fast_time:.2f}s")
+        for name, full, fast in mismatches:
+            print(f"[DIFF] {name}\n   full: {full}\n   fast: {fast}")
+        if mismatches: ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    BASE = sys.argv[1] if len(sys.argv) > 1 else "/home/johnny/MTCAUTO/MTCAUTO"
+    ok = check_parity(os.path.join(BASE, "TENCILE_OG"), os.path.join(BASE, "HARDNESS_OG"))
+    sys.exit(0 if ok else 1)
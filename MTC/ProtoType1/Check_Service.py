@@ -0,0 +1,75 @@
+# ==============================================================================
+# SERVICE CHECK
+# Starts MTC_Service on a free local port, runs the same jobs on a synthetic
+# corpus through the HTTP client, the in-process LocalClient stand-in and the
+# CLI's --server path, and compares the outputs. Prints per-job latency, the
+# service health and the first lines of /metrics.
+# Exit code is 1 when an output differs or a job fails.
+# ==============================================================================
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import subprocess
+
+from Synthetic_Corpus import generate_corpus
+from Report_Index import ReportIndex
+from MTC_Service import ExtractionService, make_server, ServiceClient, LocalClient
+
+
+def comparable(output):
+    """ Output without timings and with paths that differ between runs. """
+    output = {key: value for key, value in output.items() if key not in ("timings", "service", "output")}
+    return json.dumps(output, sort_keys=True, ensure_ascii=False)
+
+
+def check_service(heats=3, workers=2):
+    ok = True
+    work_dir = tempfile.mkdtemp(prefix="mtc_service_")
+    service = ExtractionService(workers)
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        template = generate_corpus(work_dir, heats=heats)
+        jobs = []
+        for heat, (micro, tensile, hardness) in ReportIndex.for_base(work_dir).pair()[0].items():
+            jobs.append(["extract-docx", "--no-cache", micro])
+            jobs.append(["extract-pdf", "--no-cache", "--kind", "hardness", hardness])
+            jobs.append(["full", "--no-cache", "--micro", micro, "--tensile", tensile, "--hardness", hardness,
+                         "--template", template, "--output", os.path.join(work_dir, "out", f"MTC_{heat}.xlsx")])
+
+        remote, local = ServiceClient(url), LocalClient()
+        print(f"--- Service at {url}: {len(jobs)} jobs, {workers} workers ---")
+        submitted = [remote.submit(argv) for argv in jobs]  # Queue everything, then collect
+        for argv, job in zip(jobs, submitted):
+            done = remote.job(job["id"], wait=120)
+            expected = local.run(argv)
+            same = done["exit_code"] == 0 and comparable(done["output"]) == comparable(expected["output"])
+            ok &= same
+            latency = done["latency_ms"]
+            print(f"{'[OK]  ' if same else '[DIFF]'} {argv[0]:13} queue {latency['queue']:7.1f} ms"
+                  f"  run {latency['run']:7.1f} ms  total {latency['total']:7.1f} ms"
+                  f"  (in-process {expected['latency_ms']['run']:.1f} ms)")
+
+        cli = subprocess.run([sys.executable, "MTC_CLI.py", "--server", url] + jobs[0], capture_output=True,
+                             text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        same = cli.returncode == 0 and comparable(json.loads(cli.stdout)) == comparable(local.run(jobs[0])["output"])
+        ok &= same
+        print(f"{'[OK]  ' if same else '[DIFF]'} CLI --server")
+
+        print(json.dumps(remote.health()))
+        print("\n".join(remote.metrics().splitlines()[:12]))
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_service() else 1)
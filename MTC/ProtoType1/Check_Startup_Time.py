@@ -0,0 +1,112 @@
+# ==============================================================================
+# CLI STARTUP BUDGET CHECK
+# Times `MTC_CLI.py --version` in fresh interpreters and runs every subcommand
+# on a small synthetic corpus under `python -X importtime`, to make sure
+#   - process startup stays under the budget, and
+#   - no command imports a heavy module its stage doesn't need
+#     (pdfminer for DOCX / fill, openpyxl for extraction, tkinter anywhere).
+# Exit code is 1 when a check fails.
+#
+#   python Check_Startup_Time.py --budget-ms 250
+# ==============================================================================
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from Synthetic_Corpus import generate_corpus
+from Report_Index import ReportIndex
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(HERE, "MTC_CLI.py")
+
+# Top-level modules each command must not import
+FORBIDDEN_IMPORTS = {
+    "--version": {"openpyxl", "pdfminer", "tkinter", "Working"},
+    "extract-docx": {"openpyxl", "pdfminer", "tkinter"},
+    "extract-pdf": {"openpyxl", "tkinter"},
+    "fill --writer patch": {"pdfminer", "tkinter"},
+    "fill": {"pdfminer", "tkinter"},
+    "full": {"tkinter"},
+}
+
+
+def run_cli(args, env, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + [CLI] + args
+    return subprocess.run(command, capture_output=True, text=True, env=env, cwd=HERE)
+
+
+def imported_modules(stderr):
+    """ Top-level package names from -X importtime output. """
+    names = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("imported package"): continue
+        name = line.rsplit("|", 1)[-1].strip()
+        if name: names.add(name.split(".")[0])
+    return names
+
+
+def time_startup(env, runs):
+    """ Median wall time of `MTC_CLI.py --version` in ms. """
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run_cli(["--version"], env)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def check_startup(budget_ms, runs=7):
+    ok = True
+    work_dir = tempfile.mkdtemp(prefix="mtc_startup_")
+    env = dict(os.environ, HOME=work_dir, USERPROFILE=work_dir)  # Keep the cache / timings out of the real profile
+    try:
+        template = generate_corpus(work_dir, heats=1)
+        (micro, tensile, hardness), = ReportIndex.for_base(work_dir).pair()[0].values()
+        values_path = os.path.join(work_dir, "values.json")
+        with open(values_path, "w", encoding="utf-8") as f:
+            json.dump({"micro": {"Graphite Size": "6"}, "tensile": ["520", "340", "12.5"], "hardness": ["180"]}, f)
+        output = os.path.join(work_dir, "MTC_out.xlsx")
+
+        median_ms = time_startup(env, runs)
+        within = median_ms <= budget_ms
+        ok &= within
+        print(f"{'[OK]  ' if within else '[SLOW]'} startup (--version): {median_ms:.0f} ms median (budget {budget_ms} ms)")
+
+        commands = {
+            "--version": ["--version"],
+            "extract-docx": ["extract-docx", "--no-cache", micro],
+            "extract-pdf": ["extract-pdf", "--no-cache", "--kind", "tensile", tensile],
+            "fill --writer patch": ["fill", output, "--template", template, "--data", values_path, "--writer", "patch"],
+            "fill": ["fill", output, "--template", template, "--data", values_path],
+            "full": ["full", "--no-cache", "--micro", micro, "--tensile", tensile, "--hardness", hardness,
+                     "--template", template, "--output", output],
+        }
+        for name, args in commands.items():
+            result = run_cli(args, env, importtime=True)
+            loaded = imported_modules(result.stderr) & FORBIDDEN_IMPORTS[name]
+            failed = result.returncode != 0 or bool(loaded)
+            detail = ""
+            if name != "--version" and result.returncode == 0:
+                detail = f"  startup {json.loads(result.stdout)['timings']['startup_ms']} ms"
+            print(f"{'[FAIL]' if failed else '[OK]  '} {name}{detail}"
+                  + (f"  exit {result.returncode}" if result.returncode else "")
+                  + (f"  imported {', '.join(sorted(loaded))}" if loaded else ""))
+            ok &= not failed
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check MTC_CLI startup time and lazy imports.")
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="max median wall time of `--version`")
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+    sys.exit(0 if check_startup(args.budget_ms, args.runs) else 1)
@@ -0,0 +1,83 @@
+# ==============================================================================
+# WRITER PARITY CHECK
+# Fills copies of an MTC template with the openpyxl writer and the xlsx patch
+# writer, then compares every cell value and every untouched zip member.
+# Exit code is 1 when the two outputs disagree.
+# ==============================================================================
+
+import os
+import sys
+import time
+import shutil
+import zipfile
+import tempfile
+import openpyxl
+
+from Working import update_excel_mtc
+from Xlsx_Patch_Writer import active_sheet_path
+
+SAMPLE_MICRO = {
+    "Graphite Nodularity": "85%", "Nodular Particles per mm²": "150",
+    "Graphite Size": "6", "Graphite Form": "VI (90%)",
+    "Graphite Fraction": "10%", "Ferrite / Pearlite Ratio": "70%/30%"
+}
+SAMPLE_TENSILE = ("520", "340", "12.5")
+SAMPLE_HARDNESS = ["172.9", "180.1"]
+
+
+def sheet_values(path):
+    wb = openpyxl.load_workbook(path)
+    values = {}
+    for ws in wb.worksheets:
+        for row in ws.iter_rows():
+            for cell in row:
+                if cell.value is not None: values[(ws.title, cell.coordinate)] = cell.value
+    return values
+
+
+def timed_fill(template_path, output_path, writer, logger=None):
+    shutil.copyfile(template_path, output_path)
+    start = time.perf_counter()
+    update_excel_mtc(output_path, SAMPLE_MICRO, SAMPLE_TENSILE, SAMPLE_HARDNESS, logger=logger, writer=writer)
+    return time.perf_counter() - start
+
+
+def check_parity(template_path):
+    work_dir = tempfile.mkdtemp()
+    try:
+        via_openpyxl = os.path.join(work_dir, "openpyxl.xlsx")
+        via_patch = os.path.join(work_dir, "patch.xlsx")
+        openpyxl_time = timed_fill(template_path, via_openpyxl, "openpyxl")
+        messages = []
+        patch_time = timed_fill(template_path, via_patch, "patch", logger=messages.append)
+        fell_back = any(m.startswith("Patch writer unavailable") for m in messages)
+        if fell_back: print(next(m for m in messages if m.startswith("Patch writer unavailable")))
+
+        ok = True
+        expected, actual = sheet_values(via_openpyxl), sheet_values(via_patch)
+        for key in sorted(set(expected) | set(actual)):
+            if expected.get(key) != actual.get(key):
+                ok = False
+                print(f"[DIFF] {key[0]}!{key[1]}: openpyxl={expected.get(key)!r} patch={actual.get(key)!r}")
+
+        # Everything except the active sheet must come through byte-for-byte
+        if not fell_back:
+            with zipfile.ZipFile(template_path) as src, zipfile.ZipFile(via_patch) as out:
+                sheet_path = active_sheet_path(src)
+                for info in src.infolist():
+                    if info.filename == sheet_path: continue
+                    if src.read(info) != out.read(info.filename):
+                        ok = False
+                        print(f"[DIFF] zip member changed: {info.filename}")
+
+        print(f"Cells compared: {len(expected)}   Result: {'MATCH' if ok else 'MISMATCH'}")
+        print(f"openpyxl writer: {openpyxl_time * 1000:.1f} ms   patch writer: {patch_time * 1000:.1f} ms")
+        print(f"Output size: openpyxl {os.path.getsize(via_openpyxl)} B   patch {os.path.getsize(via_patch)} B")
+        return ok
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    template = sys.argv[1] if len(sys.argv) > 1 else "/home/johnny/MTCAUTO/MTCAUTO/play_MTC.xlsx"
+    sys.exit(0 if check_parity(template) else 1)
@@ -0,0 +1,122 @@
+# ==============================================================================
+# EXTRACTION CACHE
+# SQLite store of extractor results keyed by file content hash + rules version,
+# so re-selecting the same report for a corrected MTC does not re-parse it.
+# ==============================================================================
+
+import os
+import json
+import time
+import hashlib
+
+from Sqlite_Store import SqliteStore
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".mtc_cache", "extraction_cache.sqlite3")
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024   # Stored result payloads, not the source files
+DEFAULT_MAX_AGE_DAYS = 90
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_empty_result(result):
+    """ True for {}, [], None and all-None tuples such as a failed tensile read's (None, None, None). """
+    if isinstance(result, (tuple, list)): return all(value is None for value in result)
+    return not result
+
+
+class ExtractionCache(SqliteStore):
+    """
+    Persistent result cache. Entries expire after max_age_days and the least
+    recently used ones are dropped once stored payloads exceed max_bytes.
+    """
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        super().__init__(db_path)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        with self.connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    file_hash TEXT NOT NULL,
+                    extractor TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    shape TEXT,
+                    PRIMARY KEY (file_hash, extractor, version)
+                )""")
+            columns = {row[1] for row in db.execute("PRAGMA table_info(results)")}
+            if "shape" not in columns:  # Entries from before the shape column can't say which were tuples
+                db.execute("DELETE FROM results")
+                db.execute("ALTER TABLE results ADD COLUMN shape TEXT")
+            db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    def get(self, file_hash, extractor, version):
+        """ Returns (hit, result). """
+        with self.connect() as db:
+            row = db.execute(
+                "SELECT payload, shape FROM results WHERE file_hash = ? AND extractor = ? AND version = ?",
+                (file_hash, extractor, version)).fetchone()
+            if row is None: return False, None
+            db.execute(
+                "UPDATE results SET last_used = ? WHERE file_hash = ? AND extractor = ? AND version = ?",
+                (time.time(), file_hash, extractor, version))
+        result = json.loads(row[0])
+        return True, tuple(result) if row[1] == "tuple" else result  # JSON stores tuples as lists
+
+    def put(self, file_hash, extractor, version, result):
+        payload = json.dumps(result, ensure_ascii=False)
+        shape = "tuple" if isinstance(result, tuple) else None
+        now = time.time()
+        with self.connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (file_hash, extractor, version, payload, len(payload.encode("utf-8")), now, now, shape))
+            self.evict(db)
+
+    def evict(self, db):
+        """ Drops expired entries, then least recently used ones until under max_bytes. """
+        db.execute("DELETE FROM results WHERE created < ?", (time.time() - self.max_age_days * 86400,))
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes: return
+        for file_hash, extractor, version, size in db.execute(
+                "SELECT file_hash, extractor, version, size FROM results ORDER BY last_used").fetchall():
+            db.execute("DELETE FROM results WHERE file_hash = ? AND extractor = ? AND version = ?",
+                       (file_hash, extractor, version))
+            total -= size
+            if total <= self.max_bytes: break
+
+    def clear(self):
+        with self.connect() as db:
+            db.execute("DELETE FROM results")
+
+    def call(self, extractor, path, version, logger=None, bypass=False, **options):
+        """
+        Runs extractor(path, logger=logger, **options) through the cache.
+        The key covers the file content, the extractor name, the rules version and
+        the options. bypass=True always re-parses and refreshes the stored entry.
+        """
+        def log(msg):
+            if logger: logger(msg)
+
+        if not os.path.exists(path): return extractor(path, logger=logger, **options)
+
+        file_hash = file_sha256(path)
+        key_version = version + "".join(f";{k}={options[k]}" for k in sorted(options))
+        if not bypass:
+            hit, result = self.get(file_hash, extractor.__name__, key_version)
+            if hit:
+                log(f"[CACHE] {os.path.basename(path)} ({extractor.__name__})")
+                return result
+
+        result = extractor(path, logger=logger, **options)
+        # Nothing extracted (unreadable / locked file, empty report) may be transient: parse again next time
+        if not is_empty_result(result): self.put(file_hash, extractor.__name__, key_version, result)
+        return result
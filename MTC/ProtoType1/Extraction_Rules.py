@@ -0,0 +1,468 @@
+# ==============================================================================
+# EXTRACTION RULES
+# Declarative label/value rules for the micro DOCX, tensile PDF and hardness
+# PDF reports, compiled once into regexes and matcher objects and run by one
+# engine. A rule names the label, which occurrence to use, how far to look,
+# the value pattern, the unit keyword and the MTC target cell, so a new field
+# or customer template is a new rule (or a JSON rules file), not new code,
+# and costs no extra pass over the document.
+# ==============================================================================
+
+import re
+import json
+import bisect
+import hashlib
+
+# Sentinel in PageIndex.unit_values for elements without the rule's unit keyword
+NO_UNIT = object()
+
+# 'all' rules with at least this many labels on a page are matched as one NumPy
+# batch (dense hardness-mapping sheets); fewer labels use the row lookup
+VECTOR_MIN_LABELS = 8
+
+_numpy = []
+
+def numpy_module():
+    """ NumPy when installed, else None. Optional, and imported on first use only. """
+    if not _numpy:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy.append(numpy)
+    return _numpy[0]
+
+# Characters str.isdigit() accepts besides \d that occur in reports (the ² of "mm²")
+DIGIT = "[\\d²³¹⁰⁴-⁹₀-₉]"
+
+# --- DOCX rules ---
+# occurrence: 'last' for the final summary table, 'first' for the ratio that is
+#             only filled in the opening section
+# window:     text chunks after the label that may hold the value
+# value_pattern: a chunk must match (search); group 1, if any, is the value
+# unit:       keyword the chunk must contain; split_unit also accepts the unit
+#             as the next chunk on its own ("12" "%" -> "12%")
+# join:       match against the first N chunks concatenated instead of one by one
+# strip:      regex removed from the value
+MICRO_RULES = [
+    {"field": "Graphite Nodularity", "label": "Graphite Nodularity", "occurrence": "last", "window": 5,
+     "value_pattern": "..", "unit": "%", "cell": "T36"},
+    {"field": "Nodular Particles per mm²", "label": "Nodular Particles per mm²", "occurrence": "last", "window": 5,
+     "value_pattern": f"^(?=.*{DIGIT})(?!.*%\\Z)", "strip": "[\\s\\.\\,]+$", "cell": "T37"},
+    {"field": "Graphite Size", "label": "Graphite Size", "occurrence": "last", "window": 5,
+     "value_pattern": f"^(?=.*{DIGIT})(?!.*%\\Z)", "strip": "[\\s\\.\\,]+$", "cell": "T38"},
+    {"field": "Graphite Form", "label": "Graphite Form", "occurrence": "last", "window": 5,
+     "value_pattern": "^(?=.*\\()(?=.*\\))", "cell": "T39"},
+    {"field": "Graphite Fraction", "label": "Graphite Fraction", "occurrence": "last", "window": 5,
+     "value_pattern": DIGIT, "unit": "%", "split_unit": True, "cell": "T40"},
+    {"field": "Ferrite / Pearlite Ratio", "label": "Ferrite / Pearlite Ratio", "occurrence": "first", "window": 5,
+     "join": 3, "value_pattern": "(\\d+\\.?\\d*%\\s*/\\s*\\d+\\.?\\d*%)", "cell": "T41"},
+]
+
+# --- PDF rules ---
+# occurrence: 'first' label element, or 'all' label elements top to bottom
+# tolerance / x_slack / strict: a candidate must overlap the label's row
+#             (+/- tolerance) and start at x0 >= label x0 - x_slack (> when strict)
+# unit:       keyword the candidate must contain
+# value_pattern: group 1 is the value; fallback 'text' keeps the candidate text
+#             when it doesn't match, otherwise the next candidate is tried
+# in_label:   look for the value inside the label element first
+# skip_label: ignore candidates that repeat the label text
+# cell:       one cell, or a list filled in order for 'all' rules
+TENSILE_RULES = [
+    {"field": "Tensile", "label": "Tensile Strength", "unit": "Mpa", "value_pattern": "([\\d\\.]+)",
+     "fallback": "text", "tolerance": 2, "x_slack": 5, "skip_label": True, "cell": "E26"},
+    {"field": "Yield", "label": "Yield Strength", "unit": "Mpa", "value_pattern": "([\\d\\.]+)",
+     "fallback": "text", "tolerance": 2, "x_slack": 5, "skip_label": True, "cell": "E27"},
+    {"field": "Elongation", "label": "Elongation", "unit": "%", "value_pattern": "([\\d\\.]+)",
+     "fallback": "text", "tolerance": 2, "x_slack": 5, "skip_label": True, "cell": "E28"},
+]
+
+HARDNESS_RULES = [
+    {"field": "BHN", "label": "Hardness", "occurrence": "all", "unit": "HBW", "value_pattern": "([\\d\\.]+)\\s*HBW",
+     "in_label": True, "tolerance": 5, "strict": True, "cell": ["E29", "E30"]},
+]
+
+DEFAULT_RULE_DEFINITIONS = {"micro": MICRO_RULES, "tensile": TENSILE_RULES, "hardness": HARDNESS_RULES}
+
+# Returned for a 'first' PDF rule whose label isn't on the page
+LABEL_NOT_FOUND = "Label Not Found"
+
+# Joins chunks into one searchable string; NUL cannot appear in XML text
+CHUNK_SEPARATOR = "\x00"
+
+
+class RuleError(ValueError):
+    pass
+
+
+# ==============================================================================
+# DOCX ENGINE
+# ==============================================================================
+
+def index_label_positions(chunks, labels):
+    """
+    Returns label -> (first, last) chunk index, matching case-insensitively.
+    The chunks are lowercased once as a single string and each label is located
+    with find/rfind, instead of rescanning every chunk once per label.
+    """
+    text = CHUNK_SEPARATOR.join(chunks).lower()
+    positions = {}
+    for label in labels:
+        key = label.lower()
+        first = text.find(key)
+        if first == -1: continue
+        last = text.rfind(key)
+        positions[label] = (text.count(CHUNK_SEPARATOR, 0, first), text.count(CHUNK_SEPARATOR, 0, last))
+    return positions
+
+def collect_label_windows(chunks, target_labels, window):
+    """
+    Single streaming pass over text chunks. Returns label -> neighbor chunks after
+    the chosen occurrence. Stops reading once every 'first' label has a full window
+    and no 'last' label is requested (a 'last' window is only final at the end).
+    """
+    keys = [(label, label.lower(), preference) for label, preference in target_labels.items()]
+    first_labels = {label for label, _, preference in keys if preference == "first"}
+    has_last = len(first_labels) < len(keys)
+
+    windows = {}
+    filling = set()
+    for chunk in chunks:
+        for label in list(filling):
+            windows[label].append(chunk)
+            if len(windows[label]) >= window: filling.discard(label)
+
+        lowered = chunk.lower()
+        for label, key, preference in keys:
+            if key not in lowered: continue
+            if preference == "first" and label in windows: continue
+            windows[label] = []
+            filling.add(label)
+
+        if not has_last and not filling and first_labels.issubset(windows):
+            break
+    return windows
+
+
+class TextRule:
+    """ A compiled DOCX rule: picks its value out of the chunks that follow the label. """
+    __slots__ = ("field", "label", "occurrence", "window", "pattern", "unit", "split_unit", "join", "strip",
+                 "cell", "has_group")
+
+    def __init__(self, spec):
+        try:
+            self.field = spec["field"]
+            self.label = spec.get("label", spec["field"])
+            self.pattern = re.compile(spec["value_pattern"], re.DOTALL)
+        except (KeyError, re.error) as e:
+            raise RuleError(f"Bad micro rule {spec!r}: {e}")
+        self.occurrence = spec.get("occurrence", "last")
+        if self.occurrence not in ("first", "last"):
+            raise RuleError(f"{self.field}: occurrence must be 'first' or 'last'")
+        self.window = int(spec.get("window", 5))
+        self.unit = spec.get("unit")
+        self.split_unit = bool(spec.get("split_unit"))
+        self.join = int(spec.get("join", 0))
+        self.strip = re.compile(spec["strip"]) if spec.get("strip") else None
+        self.cell = spec.get("cell")
+        self.has_group = self.pattern.groups > 0
+
+    def value_of(self, match, text):
+        value = match.group(1) if self.has_group else text
+        if self.strip: value = self.strip.sub("", value)
+        return value
+
+    def pick(self, neighbors):
+        neighbors = neighbors[:self.window]
+        if self.join:
+            combined = "".join(neighbors[:self.join])
+            match = self.pattern.search(combined)
+            return self.value_of(match, combined) if match else None
+        for j, text in enumerate(neighbors):
+            match = self.pattern.search(text)
+            if not match: continue
+            if self.unit is None or self.unit in text: return self.value_of(match, text)
+            if self.split_unit and j + 1 < len(neighbors) and neighbors[j + 1] == self.unit:
+                return self.value_of(match, text) + self.unit
+        return None
+
+
+class DocxRuleSet:
+    """ All DOCX rules; every label is located in one pass over the document text. """
+    def __init__(self, specs):
+        self.rules = [TextRule(spec) for spec in specs]
+        self.targets = {}
+        for rule in self.rules:
+            if rule.label in self.targets: raise RuleError(f"Duplicate micro label: {rule.label}")
+            self.targets[rule.label] = rule.occurrence
+        self.window = max((rule.window for rule in self.rules), default=0)
+
+    def windows_from_chunks(self, chunks):
+        """ label -> neighbor chunks, from a fully loaded chunk list. """
+        windows = {}
+        for label, (first, last) in index_label_positions(chunks, self.targets).items():
+            target = last if self.targets[label] == "last" else first
+            windows[label] = chunks[target + 1:target + 1 + self.window]
+        return windows
+
+    def windows_from_stream(self, chunks):
+        """ label -> neighbor chunks, reading a chunk iterator once (stops early when it can). """
+        return collect_label_windows(chunks, self.targets, self.window)
+
+    def pick(self, windows):
+        """ Yields (rule, value or None) for every rule whose label was found. """
+        for rule in self.rules:
+            if rule.label in windows: yield rule, rule.pick(windows[rule.label])
+
+
+# ==============================================================================
+# PDF ENGINE
+# ==============================================================================
+
+class PageIndex:
+    """
+    Page text elements bucketed into fixed-height rows, each row sorted by x0.
+    A "right of and vertically aligned" query only visits the rows the label
+    spans, so lookups no longer scan every element on the page.
+    """
+    def __init__(self, elements, row_height=10.0):
+        self.texts = [e.get_text() for e in elements]  # Only text and bbox are kept, not the elements
+        self.stripped = [t.strip() for t in self.texts]
+        self.bboxes = [e.bbox for e in elements]
+        self.row_height = row_height
+        self.rows = {}
+        for i, (x0, y0, x1, y1) in enumerate(self.bboxes):
+            for row in range(int(y0 // row_height), int(y1 // row_height) + 1):
+                self.rows.setdefault(row, []).append((x0, i))
+        for row in self.rows.values(): row.sort()
+        self.matches = {}
+
+    def unit_values(self, pattern, unit):
+        """
+        Per element: NO_UNIT if the text lacks unit, else group 1 of pattern (None
+        without a match). Computed once per page and pattern, however many labels ask.
+        """
+        key = (pattern.pattern, unit)
+        values = self.matches.get(key)
+        if values is None:
+            values = self.matches[key] = []
+            for text in self.stripped:
+                if unit not in text: values.append(NO_UNIT)
+                else:
+                    match = pattern.search(text)
+                    values.append(match.group(1) if match else None)
+        return values
+
+    def find_first(self, text):
+        """ Index of the first element containing text, or -1. """
+        for i, element_text in enumerate(self.texts):
+            if text in element_text: return i
+        return -1
+
+    def find_all(self, text):
+        """ Indexes of every element containing text, top of the page first. """
+        found = [i for i, element_text in enumerate(self.texts) if text in element_text]
+        found.sort(key=lambda i: self.bboxes[i][3], reverse=True)
+        return found
+
+    def aligned_right_of(self, bbox, tolerance, min_x0, strict=False):
+        """
+        Indexes of elements vertically overlapping bbox (+/- tolerance) whose x0 is
+        >= min_x0 (> when strict), nearest first. Ties keep page order.
+        """
+        lx0, ly0, lx1, ly1 = bbox
+        low, high = ly0 - tolerance, ly1 + tolerance
+        hits = set()
+        for row in range(int(low // self.row_height), int(high // self.row_height) + 1):
+            entries = self.rows.get(row)
+            if not entries: continue
+            if strict: start = bisect.bisect_right(entries, (min_x0, len(self.texts)))
+            else: start = bisect.bisect_left(entries, (min_x0, -1))
+            for x0, i in entries[start:]:
+                ey0, ey1 = self.bboxes[i][1], self.bboxes[i][3]
+                if ey0 < high and ey1 > low: hits.add((x0, i))
+        return [i for _, i in sorted(hits)]
+
+
+class LayoutRule:
+    """ A compiled PDF rule: finds the value right of (or inside) its label element. """
+    __slots__ = ("field", "label", "occurrence", "pattern", "unit", "fallback", "tolerance", "x_slack", "strict",
+                 "in_label", "skip_label", "cells")
+
+    def __init__(self, spec):
+        try:
+            self.field = spec["field"]
+            self.label = spec.get("label", spec["field"])
+            self.pattern = re.compile(spec["value_pattern"])
+        except (KeyError, re.error) as e:
+            raise RuleError(f"Bad PDF rule {spec!r}: {e}")
+        if self.pattern.groups < 1: raise RuleError(f"{self.field}: value_pattern needs a group")
+        self.occurrence = spec.get("occurrence", "first")
+        if self.occurrence not in ("first", "all"):
+            raise RuleError(f"{self.field}: occurrence must be 'first' or 'all'")
+        self.unit = spec.get("unit") or ""
+        self.fallback = spec.get("fallback")
+        self.tolerance = float(spec.get("tolerance", 2))
+        self.x_slack = float(spec.get("x_slack", 0))
+        self.strict = bool(spec.get("strict"))
+        self.in_label = bool(spec.get("in_label"))
+        self.skip_label = bool(spec.get("skip_label"))
+        cell = spec.get("cell")
+        self.cells = cell if isinstance(cell, list) else ([cell] if cell else [])
+
+    def value_at(self, index, label_i):
+        """ Value for the label element at label_i, or None. """
+        if self.in_label:
+            match = self.pattern.search(index.stripped[label_i])
+            if match: return match.group(1)
+
+        lx0, ly0, lx1, ly1 = index.bboxes[label_i]
+        values = index.unit_values(self.pattern, self.unit)
+        for i in index.aligned_right_of(index.bboxes[label_i], self.tolerance, lx0 - self.x_slack, self.strict):
+            if values[i] is NO_UNIT: continue
+            if self.skip_label and self.label in index.stripped[i]: continue
+            if index.bboxes[i][0] - lx1 >= 9999: break
+            if values[i] is not None: return values[i]
+            if self.fallback == "text": return index.stripped[i]
+        return None
+
+    def values_at(self, index, label_indexes):
+        """
+        value_at for many labels at once: alignment, right-of and distance tests
+        for every label / candidate pair as NumPy arrays, nearest candidate per
+        label by argmax over candidates sorted like aligned_right_of's result.
+        """
+        np = numpy_module()
+        if np is None or not label_indexes or len(label_indexes) < VECTOR_MIN_LABELS:
+            return [self.value_at(index, i) for i in label_indexes]
+
+        values = index.unit_values(self.pattern, self.unit)
+        candidates = sorted((index.bboxes[i][0], i) for i, value in enumerate(values)
+                            if value is not NO_UNIT and not (self.skip_label and self.label in index.stripped[i]))
+        candidates = [i for _, i in candidates]
+        found = [None] * len(label_indexes)
+        if candidates:
+            boxes = np.array([index.bboxes[i] for i in candidates], dtype=float)
+            labels = np.array([index.bboxes[i] for i in label_indexes], dtype=float)
+            x0, y0, y1 = boxes[:, 0], boxes[:, 1], boxes[:, 3]
+            min_x0 = labels[:, 0:1] - self.x_slack
+            eligible = ((y0 < labels[:, 3:4] + self.tolerance) & (y1 > labels[:, 1:2] - self.tolerance)
+                        & ((x0 > min_x0) if self.strict else (x0 >= min_x0))
+                        & (x0 - labels[:, 2:3] < 9999))
+            if self.fallback != "text":
+                eligible &= np.array([values[i] is not None for i in candidates])
+            nearest = eligible.argmax(axis=1)
+            for row, hit in enumerate(eligible.any(axis=1)):
+                if not hit: continue
+                i = candidates[nearest[row]]
+                found[row] = values[i] if values[i] is not None else index.stripped[i]
+        if self.in_label:
+            for row, label_i in enumerate(label_indexes):
+                match = self.pattern.search(index.stripped[label_i])
+                if match: found[row] = match.group(1)
+        return found
+
+    def apply(self, index):
+        """ 'first' rules return a value, None or LABEL_NOT_FOUND; 'all' rules a list of values. """
+        if self.occurrence == "all":
+            return [value for value in self.values_at(index, index.find_all(self.label)) if value]
+        label_i = index.find_first(self.label)
+        if label_i == -1: return LABEL_NOT_FOUND
+        return self.value_at(index, label_i)
+
+    def resolved(self, value):
+        """ True once later pages can't change the value: a found 'first' value, or one reading per cell. """
+        if self.occurrence == "all": return len(value) >= max(1, len(self.cells))
+        return value is not None and value != LABEL_NOT_FOUND
+
+
+class PdfRuleSet:
+    """ All rules for one PDF report type, evaluated against a single PageIndex. """
+    def __init__(self, specs):
+        self.rules = [LayoutRule(spec) for spec in specs]
+
+    def apply(self, elements):
+        """ field -> value for every rule (elements may be a PageIndex or a list of text elements). """
+        index = elements if isinstance(elements, PageIndex) else PageIndex(elements)
+        return {rule.field: rule.apply(index) for rule in self.rules}
+
+    def scan(self):
+        return PdfScan(self)
+
+
+class PdfScan:
+    """
+    Merges per-page results of a PdfRuleSet in page order: a 'first' rule keeps
+    the first page that yields a value, an 'all' rule collects readings from
+    every page read. `done` turns True once no further page can change the result.
+    """
+    def __init__(self, rule_set):
+        self.rules = rule_set.rules
+        self.found = {rule.field: [] if rule.occurrence == "all" else LABEL_NOT_FOUND for rule in self.rules}
+        self.pages = 0
+
+    def add_page(self, elements):
+        index = elements if isinstance(elements, PageIndex) else PageIndex(elements)
+        self.pages += 1
+        for rule in self.rules:
+            current = self.found[rule.field]
+            if rule.occurrence == "all":
+                if not rule.resolved(current): current.extend(rule.apply(index))
+            elif not rule.resolved(current):
+                value = rule.apply(index)
+                if value != LABEL_NOT_FOUND: self.found[rule.field] = value  # Label seen: None beats "not found"
+        return self.done
+
+    @property
+    def done(self):
+        return all(rule.resolved(self.found[rule.field]) for rule in self.rules)
+
+
+# ==============================================================================
+# RULE BOOK
+# ==============================================================================
+
+class RuleBook:
+    """ Compiled micro / tensile / hardness rule sets plus a fingerprint of their definitions. """
+    def __init__(self, definitions):
+        self.definitions = definitions
+        self.micro = DocxRuleSet(definitions.get("micro", []))
+        self.tensile = PdfRuleSet(definitions.get("tensile", []))
+        self.hardness = PdfRuleSet(definitions.get("hardness", []))
+        blob = json.dumps(definitions, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        self.fingerprint = hashlib.sha1(blob).hexdigest()[:10]
+
+    def field_values(self, micro_data, tensile_data, hardness_data):
+        """
+        Ordered (field, n, cell, value) list of everything an MTC receives;
+        n numbers repeated readings (BHN 1, BHN 2, ...) and is 0 for single values.
+        """
+        rows = []
+        for rule, value in zip(self.tensile.rules, tensile_data):
+            if value and rule.cells: rows.append((rule.field, 0, rule.cells[0], value))
+        # Hardness readings fill the hardness cells in order
+        hardness_cells = [(cell, rule.field) for rule in self.hardness.rules for cell in rule.cells]
+        for n, ((cell, field), value) in enumerate(zip(hardness_cells, hardness_data), start=1):
+            rows.append((field, n, cell, value))
+        for rule in self.micro.rules:
+            if rule.field in micro_data and rule.cell: rows.append((rule.field, 0, rule.cell, micro_data[rule.field]))
+        return rows
+
+    def cell_values(self, micro_data, tensile_data, hardness_data):
+        """ Ordered (cell, value, description) list of everything an MTC receives. """
+        return [(cell, value, f"{field} {n}" if n else field)
+                for field, n, cell, value in self.field_values(micro_data, tensile_data, hardness_data)]
+
+
+def load_rules(path):
+    """
+    RuleBook from a JSON file shaped like DEFAULT_RULE_DEFINITIONS; report types
+    the file leaves out keep their default rules.
+    """
+    with open(path, encoding="utf-8") as f:
+        definitions = json.load(f)
+    return RuleBook(dict(DEFAULT_RULE_DEFINITIONS, **definitions))
+
+
+DEFAULT_RULES = RuleBook(DEFAULT_RULE_DEFINITIONS)
@@ -0,0 +1,203 @@
+# ==============================================================================
+# FOLDER WATCHER
+# Headless service that watches the MICRO_REPORT / TENCILE_OG / HARDNESS_OG drop
+# folders and builds an MTC as soon as all three reports of a heat have landed.
+# Uses watchdog (inotify / ReadDirectoryChanges) when installed to wake early;
+# a periodic rescan always runs, which is what network shares rely on.
+# ==============================================================================
+
+import os
+import time
+import threading
+
+from Batch_MTC import build_heat_mtc
+from Report_Index import parse_report_name, group_by_part
+from Report_Mirror import sync_file
+from Isolated_Pool import IsolatedPool, DEFAULT_TIMEOUT
+from Stage_Timing import TIMINGS, call_with_spans, export_timings
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+
+REPORT_KINDS = (("micro", ".docx"), ("tensile", ".pdf"), ("hardness", ".pdf"))
+
+
+class ReportWatcher:
+    """
+    Tracks every report file by (size, mtime). A file only counts once it has
+    been unchanged for settle_seconds, so half-copied reports are never parsed.
+    At most `workers` heats are extracted at a time; a burst simply queues.
+    A heat is rebuilt when any of its three reports changes. With mirror_dir
+    set, the reports are copied to local disk before extraction. A heat still
+    running after heat_timeout seconds is killed and reported as failed.
+    """
+    def __init__(self, micro_dir, tensile_dir, hardness_dir, template_path, output_dir,
+                 workers=2, poll_seconds=5.0, settle_seconds=3.0, use_events=True,
+                 writer="openpyxl", mirror_dir=None, heat_timeout=3 * DEFAULT_TIMEOUT, logger=print):
+        self.folders = {"micro": micro_dir, "tensile": tensile_dir, "hardness": hardness_dir}
+        self.template_path = template_path
+        self.output_dir = output_dir
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.settle_seconds = settle_seconds
+        self.use_events = use_events and Observer is not None
+        self.writer = writer
+        self.mirror_dir = mirror_dir
+        self.heat_timeout = heat_timeout
+        self.logger = logger
+
+        self.seen = {}       # path -> (size, mtime, unchanged since)
+        self.built = {}      # heat -> signature of the reports its MTC was built from
+        self.running = {}    # heat -> (future, signature)
+        self.wakeup = threading.Event()
+        self.executor = None
+
+    def log(self, msg):
+        if self.logger: self.logger(msg)
+
+    def stable_reports(self, now):
+        """
+        heat -> {kind: (path, size, mtime)} for reports that have settled, paired by part
+        and choosing among re-tests the same way as ReportIndex.pair() (heat is its pair key).
+        """
+        settled, sizes = {}, {}
+        present = set()
+        for kind, extension in REPORT_KINDS:
+            folder = self.folders[kind]
+            if not os.path.isdir(folder): continue
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.lower().endswith(extension) or name.startswith("~$"): continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue  # Removed or locked mid-scan
+                    present.add(entry.path)
+                    size, mtime = st.st_size, st.st_mtime
+                    previous = self.seen.get(entry.path)
+                    if previous is None or previous[:2] != (size, mtime):
+                        self.seen[entry.path] = (size, mtime, now)
+                        continue
+                    if size == 0 or now - previous[2] < self.settle_seconds: continue
+                    report = parse_report_name(name)
+                    settled.setdefault(report.heat, {}).setdefault(kind, []).append((entry.path, report.part, mtime))
+                    sizes[entry.path] = size
+        for path in set(self.seen) - present: del self.seen[path]
+        stable = {}
+        for heat, reports in settled.items():
+            for key, group in group_by_part(heat, reports).items():
+                stable[key] = {kind: (path, sizes[path], mtime) for kind, (path, _, mtime) in group.items()}
+        return stable
+
+    def collect_finished(self):
+        finished = False
+        for heat, (future, signature) in list(self.running.items()):
+            if not future.done(): continue
+            finished = True
+            del self.running[heat]
+            try:
+                path, spans = future.result()
+                TIMINGS.extend(spans)
+                self.built[heat] = signature
+                self.log(f"[DONE] {heat} -> {os.path.basename(path)}")
+            except Exception as e:
+                self.built[heat] = signature  # Don't retry until a report changes
+                self.log(f"[FAIL] {heat}: {type(e).__name__}: {e}")
+        if finished: export_timings(logger=self.log)
+
+    def output_is_current(self, heat, signature):
+        """ True when an MTC from an earlier run is newer than all three reports (e.g. after a restart). """
+        output_path = os.path.join(self.output_dir, f"MTC_{heat}.xlsx")
+        try:
+            return os.path.getmtime(output_path) >= max(mtime for _, _, mtime in signature)
+        except OSError:
+            return False
+
+    def poll_once(self, now=None):
+        """ One scan: submit every complete, settled heat that needs (re)building. Returns submitted heats. """
+        now = time.time() if now is None else now
+        self.collect_finished()
+        submitted = []
+        for heat, reports in sorted(self.stable_reports(now).items()):
+            if len(reports) < 3 or heat in self.running: continue
+            signature = tuple(reports[kind] for kind, _ in REPORT_KINDS)
+            if self.built.get(heat) == signature: continue
+            if self.output_is_current(heat, signature):
+                self.built[heat] = signature
+                continue
+            if len(self.running) >= self.workers: break  # Bounded; the rest wait for the next scan
+            paths = [path for path, _, _ in signature]
+            if self.mirror_dir:
+                try:
+                    paths = [sync_file(path, self.mirror_dir) for path in paths]
+                except OSError as e:
+                    self.log(f"[WAIT] {heat}: copy to local disk failed ({e})")
+                    continue
+            future = self.get_executor().submit(
+                call_with_spans, build_heat_mtc, heat, *paths, self.template_path, self.output_dir, True, self.writer,
+                origin="watcher")
+            self.running[heat] = (future, signature)
+            submitted.append(heat)
+            self.log(f"[QUEUE] {heat}")
+        return submitted
+
+    def get_executor(self):
+        if self.executor is None:
+            self.executor = IsolatedPool(self.workers, timeout=self.heat_timeout)
+        return self.executor
+
+    def start_observer(self):
+        if not self.use_events: return None
+        watcher = self
+
+        class Wake(FileSystemEventHandler):
+            def on_any_event(self, event):
+                watcher.wakeup.set()
+
+        observer = Observer()
+        for folder in self.folders.values():
+            if os.path.isdir(folder): observer.schedule(Wake(), folder, recursive=False)
+        observer.start()
+        return observer
+
+    def run(self, stop_event=None):
+        """ Runs until stop_event is set (or Ctrl+C). """
+        stop_event = stop_event or threading.Event()
+        os.makedirs(self.output_dir, exist_ok=True)
+        observer = self.start_observer()
+        self.log(f"--- Watching report folders ({'events + polling' if observer else 'polling'}) ---")
+        try:
+            while not stop_event.is_set():
+                self.poll_once()
+                # Rescan sooner while files are settling or jobs are running
+                busy = self.running or any(time.time() - since < self.settle_seconds
+                                           for _, _, since in self.seen.values())
+                self.wakeup.wait(min(self.poll_seconds, self.settle_seconds / 2) if busy else self.poll_seconds)
+                self.wakeup.clear()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if observer:
+                observer.stop(); observer.join()
+            if self.executor: self.executor.shutdown(wait=True)
+            self.collect_finished()
+            self.log("Watcher stopped.")
+
+
+# ==============================================================================
+# MAIN ENTRY POINT
+# ==============================================================================
+
+if __name__ == "__main__":
+    BASE = "/home/johnny/MTCAUTO/MTCAUTO"
+    ReportWatcher(
+        os.path.join(BASE, "MICRO_REPORT"),
+        os.path.join(BASE, "TENCILE_OG"),
+        os.path.join(BASE, "HARDNESS_OG"),
+        os.path.join(BASE, "play_MTC.xlsx"),
+        os.path.join(BASE, "MTC_OUTPUT"),
+    ).run()
@@ -0,0 +1,270 @@
+# ==============================================================================
+# ISOLATED WORKER POOL
+# Process pool that can kill one task. A malformed or huge PDF can hang
+# pdfminer for good; ProcessPoolExecutor has no way to stop a running task, so
+# one bad report blocked a batch and left the UI stuck. Here every worker owns a
+# pipe and a deadline: a task that runs past `timeout`, or is cancelled, gets
+# its worker killed and replaced, and its future fails with ExtractionTimeout /
+# ExtractionCancelled. Other tasks keep running. submit() / shutdown() match
+# ProcessPoolExecutor, and the futures work with as_completed(). On POSIX each
+# worker leads its own session, so a kill also reaches processes it started.
+# ==============================================================================
+
+import os
+import time
+import signal
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait as wait_ready
+
+DEFAULT_TIMEOUT = 120.0  # Seconds one task may run before its worker is killed
+KILL_GRACE = 2.0         # Seconds between terminate() and kill()
+
+IN_POOL_WORKER = False   # True inside a worker process; extractors then stay single-process
+
+
+class ExtractionTimeout(TimeoutError):
+    pass
+
+
+class ExtractionCancelled(Exception):
+    pass
+
+
+class WorkerDied(RuntimeError):
+    pass
+
+
+def signal_group(pgid, sig):
+    """ Sends sig to a worker's process group (the worker and everything it started); no-op off POSIX. """
+    if not hasattr(os, "killpg"): return
+    try:
+        os.killpg(pgid, sig)
+    except OSError:
+        pass  # Group already gone
+
+
+def in_pool_worker():
+    return IN_POOL_WORKER
+
+
+def worker_main(conn, initializer, initargs):
+    """ Worker loop: runs (func, args, kwargs) tasks from the pipe until it closes or gets None. """
+    global IN_POOL_WORKER
+    IN_POOL_WORKER = True
+    if hasattr(os, "setsid"): os.setsid()  # Own process group: Worker.kill() takes its children along
+    if initializer: initializer(*initargs)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None: return
+        func, args, kwargs = task
+        try:
+            reply = (True, func(*args, **kwargs))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:  # Result or exception that doesn't pickle
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class Worker:
+    __slots__ = ("process", "conn", "future", "deadline")
+
+    def __init__(self, initializer, initargs):
+        self.conn, child_conn = multiprocessing.Pipe()
+        # Not daemonic, so a task may still use multiprocessing; kill() takes its process group along
+        self.process = multiprocessing.Process(target=worker_main, args=(child_conn, initializer, initargs))
+        self.process.start()
+        child_conn.close()
+        self.future = self.deadline = None
+
+    def kill(self):
+        """ Stops the worker and, on POSIX, any processes it started (e.g. a hung page-layout pool). """
+        pid = self.process.pid
+        if self.process.is_alive():
+            signal_group(pid, signal.SIGTERM)
+            self.process.terminate()
+            self.process.join(KILL_GRACE)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        # Children that outlived a killed / crashed worker keep its group alive (and its pid from reuse)
+        if self.process.exitcode != 0: signal_group(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+        self.conn.close()
+
+
+class IsolatedPool:
+    """
+    At most max_workers worker processes, started on demand. One dispatcher
+    thread hands out tasks in submission order and watches results, deadlines
+    and worker exits.
+    """
+    def __init__(self, max_workers=None, timeout=DEFAULT_TIMEOUT, initializer=None, initargs=()):
+        self.max_workers = max_workers or multiprocessing.cpu_count() or 1
+        self.timeout = timeout
+        self.initializer = initializer
+        self.initargs = initargs
+        self.lock = threading.Lock()
+        self.tasks = deque()       # (future, func, args, kwargs) not yet started
+        self.workers = []
+        self.cancel_running = False
+        self.cancelling = set()    # Running futures whose workers are to be killed
+        self.closed = False
+        self.wake_recv, self.wake_send = multiprocessing.Pipe(duplex=False)
+        self.thread = threading.Thread(target=self.dispatch_loop, name="IsolatedPool", daemon=True)
+        self.thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        with self.lock:
+            if self.closed: raise RuntimeError("cannot submit after shutdown")
+            self.tasks.append((future, func, args, kwargs))
+        self.wake()
+        return future
+
+    def cancel(self, future):
+        """
+        Cancels one task with ExtractionCancelled: drops it if still queued, kills its
+        worker if running. Returns False if it had already finished.
+        """
+        with self.lock:
+            if future.done(): return False
+            queued = next((task for task in self.tasks if task[0] is future), None)
+            if queued is not None:
+                self.tasks.remove(queued)
+                if future.set_running_or_notify_cancel(): future.set_exception(ExtractionCancelled("Cancelled before it started"))
+                return True
+            self.cancelling.add(future)
+        self.wake()
+        return True
+
+    def cancel_all(self):
+        """ Fails queued tasks and kills running ones with ExtractionCancelled; the pool stays usable. """
+        with self.lock:
+            self.fail_queued(ExtractionCancelled("Cancelled before it started"))
+            self.cancel_running = True
+        self.wake()
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """ Like ProcessPoolExecutor.shutdown; cancel_futures also kills running tasks. """
+        with self.lock:
+            self.closed = True
+            if cancel_futures:
+                self.fail_queued(ExtractionCancelled("Pool shut down"))
+                self.cancel_running = True
+        self.wake()
+        if wait: self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown(wait=True)
+
+    def wake(self):
+        try:
+            self.wake_send.send(None)
+        except OSError:
+            pass  # Dispatcher already gone
+
+    # Callers hold self.lock
+    def fail_queued(self, error):
+        while self.tasks:
+            future = self.tasks.popleft()[0]
+            if future.set_running_or_notify_cancel(): future.set_exception(error)
+
+    def start_tasks(self):
+        while self.tasks:
+            idle = next((w for w in self.workers if w.future is None), None)
+            if idle is None:
+                if len(self.workers) >= self.max_workers: return
+                try:
+                    idle = Worker(self.initializer, self.initargs)
+                except OSError as e:
+                    future = self.tasks.popleft()[0]
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(WorkerDied(f"Can't start worker: {e}"))
+                    continue
+                self.workers.append(idle)
+            future, func, args, kwargs = self.tasks.popleft()
+            if not future.set_running_or_notify_cancel(): continue  # Cancelled while queued
+            try:
+                idle.conn.send((func, args, kwargs))
+            except Exception as e:  # Task doesn't pickle, or the worker is gone
+                future.set_exception(e)
+                continue
+            idle.future = future
+            idle.deadline = time.monotonic() + self.timeout if self.timeout else None
+
+    def settle(self, worker, ok, value):
+        """ The task finished (returned or raised); the worker takes the next one. """
+        future = worker.future
+        worker.future = worker.deadline = None
+        if ok: future.set_result(value)
+        else: future.set_exception(value)
+
+    def retire(self, worker, error):
+        """ Kills the worker after a timeout / cancel / crash and fails its task; a new one starts on demand. """
+        future = worker.future
+        worker.future = worker.deadline = None
+        worker.kill()
+        self.workers.remove(worker)
+        future.set_exception(error)
+
+    def died(self, worker):
+        worker.process.join(KILL_GRACE)
+        return WorkerDied(f"worker exited with code {worker.process.exitcode}")
+
+    def dispatch_loop(self):
+        while True:
+            with self.lock:
+                if self.cancel_running or self.cancelling:  # Before starting tasks submitted after the cancel
+                    for worker in [w for w in self.workers if w.future is not None]:
+                        if self.cancel_running or worker.future in self.cancelling:
+                            self.retire(worker, ExtractionCancelled("Cancelled"))
+                    self.cancel_running = False
+                    self.cancelling.clear()
+                self.start_tasks()
+                busy = [w for w in self.workers if w.future is not None]
+                if self.closed and not self.tasks and not busy: break
+
+            deadlines = [w.deadline for w in busy if w.deadline is not None]
+            wait_s = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            handles = [self.wake_recv] + [w.conn for w in busy] + [w.process.sentinel for w in busy]
+            ready = wait_ready(handles, wait_s)
+            while self.wake_recv.poll(): self.wake_recv.recv()
+
+            now = time.monotonic()
+            with self.lock:
+                for worker in busy:
+                    if worker.future is None: continue
+                    if worker.conn in ready:
+                        try:
+                            ok, value = worker.conn.recv()
+                        except (EOFError, OSError):
+                            self.retire(worker, self.died(worker))
+                            continue
+                        except Exception as e:  # Reply that doesn't unpickle here
+                            ok, value = False, RuntimeError(f"{type(e).__name__}: {e}")
+                        self.settle(worker, ok, value)
+                    elif worker.process.sentinel in ready:
+                        self.retire(worker, self.died(worker))
+                    elif worker.deadline is not None and now >= worker.deadline:
+                        self.retire(worker, ExtractionTimeout(f"killed after {self.timeout:g} s without finishing"))
+
+        for worker in self.workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.process.join(KILL_GRACE)
+            worker.kill()
+        self.workers = []
+        self.wake_recv.close()
+        self.wake_send.close()
@@ -0,0 +1,106 @@
+# ==============================================================================
+# UI LOG SINK
+# Worker threads hand log lines and progress values to a LogSink instead of
+# scheduling one Tk callback per message. The UI drains it at a fixed frame
+# rate: one insert per pane per frame, only the latest progress / status value,
+# and at most max_lines pending lines per pane (older ones are only on disk).
+# Every line is also spooled to a per-run log file.
+# ==============================================================================
+
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+LOG_DIR = os.path.join(os.path.expanduser("~"), ".mtc_cache", "logs")
+FRAME_MS = 50             # UI drain interval (20 frames / s)
+MAX_PANE_LINES = 2000     # Lines kept per log pane; the spool file has everything
+SPOOL_FLUSH_LINES = 5000  # Writers flush the spool themselves past this, if the UI stalls
+KEEP_SPOOL_FILES = 50
+
+
+class LogSink:
+    """ Thread-safe buffer of pane lines and latest values between worker threads and the UI thread. """
+    def __init__(self, panes, max_lines=MAX_PANE_LINES, log_dir=LOG_DIR):
+        self.lock = threading.Lock()
+        self.max_lines = max_lines
+        self.log_dir = log_dir
+        self.pending = {pane: deque(maxlen=max_lines) for pane in panes}
+        self.dropped = {pane: 0 for pane in panes}
+        self.values = {}
+        self.spool_lines = []
+        self.spool_file = None
+        self.spool_path = None
+
+    def write(self, pane, message):
+        stamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        with self.lock:
+            lines = self.pending[pane]
+            if len(lines) == lines.maxlen: self.dropped[pane] += 1
+            lines.append(message)
+            self.spool_lines.append(f"{stamp} [{pane}] {message}\n")
+            if len(self.spool_lines) >= SPOOL_FLUSH_LINES: self._flush_spool()
+
+    def set(self, key, value):
+        """ Progress / status style values: only the latest one per frame reaches the UI. """
+        with self.lock:
+            self.values[key] = value
+
+    def drain(self):
+        """
+        Returns ({pane: [lines]}, {pane: dropped count}, {key: latest value}) gathered
+        since the last call, and writes the spooled lines to disk.
+        """
+        with self.lock:
+            batches = {pane: list(lines) for pane, lines in self.pending.items() if lines}
+            dropped = {pane: count for pane, count in self.dropped.items() if count}
+            values = self.values
+            for lines in self.pending.values(): lines.clear()
+            for pane in self.dropped: self.dropped[pane] = 0
+            self.values = {}
+            self._flush_spool()
+        return batches, dropped, values
+
+    def clear(self):
+        """ Drops lines and values not yet shown (new run); spooled lines are still written. """
+        self.drain()
+
+    def start_spool(self, name="mtc"):
+        """ Starts a new spool file for a run and returns its path (None if the log folder is unusable). """
+        with self.lock:
+            self._flush_spool()
+            self._close_spool()
+            try:
+                os.makedirs(self.log_dir, exist_ok=True)
+                self.spool_path = os.path.join(self.log_dir, f"{name}_{datetime.now():%Y%m%d_%H%M%S_%f}.log")
+                self.spool_file = open(self.spool_path, "a", encoding="utf-8")
+            except OSError:
+                self.spool_file = self.spool_path = None
+            self._prune_spools()
+            return self.spool_path
+
+    def close(self):
+        with self.lock:
+            self._flush_spool()
+            self._close_spool()
+
+    # Callers hold self.lock
+    def _flush_spool(self):
+        if self.spool_file and self.spool_lines:
+            try:
+                self.spool_file.writelines(self.spool_lines)
+                self.spool_file.flush()
+            except OSError:
+                pass
+        self.spool_lines = []
+
+    def _close_spool(self):
+        if self.spool_file: self.spool_file.close()
+        self.spool_file = None
+
+    def _prune_spools(self):
+        try:
+            names = sorted(name for name in os.listdir(self.log_dir) if name.endswith(".log"))
+            for name in names[:-KEEP_SPOOL_FILES]: os.remove(os.path.join(self.log_dir, name))
+        except OSError:
+            pass
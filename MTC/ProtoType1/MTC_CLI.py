@@ -0,0 +1,253 @@
+# ==============================================================================
+# MTC COMMAND LINE
+# Headless entry point for batch files and scheduled jobs. Prints JSON.
+#
+#   python MTC_CLI.py extract-docx MICRO_REPORT/F305-013-(BE406)-6.docx
+#   python MTC_CLI.py extract-pdf --kind tensile TENCILE_OG/F326-029(AF427)-4(9).pdf
+#   python MTC_CLI.py fill MTC_F305.xlsx --template play_MTC.xlsx --data values.json
+#   python MTC_CLI.py full --micro a.docx --tensile b.pdf --hardness c.pdf \
+#                          --template play_MTC.xlsx --output MTC_F305.xlsx
+#
+# Only the standard library loads at startup; each command imports the pipeline
+# pieces it needs, so extract-docx never loads pdfminer and extract-pdf never
+# loads openpyxl. Check_Startup_Time.py keeps startup under its budget.
+# ==============================================================================
+
+import time
+STARTED = time.perf_counter()
+
+import os
+import sys
+import json
+import argparse
+
+CLI_VERSION = "1.0"
+
+
+def add_cache_flags(parser):
+    parser.add_argument("--no-cache", action="store_true", help="parse the reports, never read or write the result cache")
+    parser.add_argument("--refresh-cache", action="store_true", help="re-parse and overwrite cached results")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="MTC_CLI", description="Extract report values and fill MTC workbooks.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {CLI_VERSION}")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print extractor log lines to stderr")
+    parser.add_argument("--indent", type=int, default=None, help="pretty-print the JSON output")
+    parser.add_argument("--export-timings", action="store_true",
+                        help="append stage timings to the JSON-lines / Prometheus files")
+    parser.add_argument("--server", default=os.environ.get("MTC_SERVICE_URL"),
+                        help="run the command on a resident MTC_Service (default: $MTC_SERVICE_URL)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    docx = commands.add_parser("extract-docx", help="microstructure values from micro report DOCX files")
+    docx.add_argument("paths", nargs="+")
+    docx.add_argument("--streaming", action="store_true", help="parse document.xml incrementally")
+    add_cache_flags(docx)
+
+    pdf = commands.add_parser("extract-pdf", help="tensile or hardness values from report PDFs")
+    pdf.add_argument("paths", nargs="+")
+    pdf.add_argument("--kind", choices=("tensile", "hardness"), required=True)
+    pdf.add_argument("--fast-layout", action="store_true", help="line grouping without full layout analysis")
+    add_cache_flags(pdf)
+
+    fill = commands.add_parser("fill", help="write extracted values (JSON) into an MTC workbook")
+    fill.add_argument("excel")
+    fill.add_argument("--data", required=True, help="JSON file shaped like the 'values' of `full`, or - for stdin")
+    fill.add_argument("--template", help="copy this blank template to EXCEL first")
+    fill.add_argument("--writer", choices=("openpyxl", "patch"), default="openpyxl")
+
+    full = commands.add_parser("full", help="extract all three reports and write the MTC")
+    full.add_argument("--micro", required=True)
+    full.add_argument("--tensile", required=True)
+    full.add_argument("--hardness", required=True)
+    full.add_argument("--template", help="copy this blank template to --output first")
+    full.add_argument("--output", required=True, help="MTC workbook to fill")
+    full.add_argument("--writer", choices=("openpyxl", "patch"), default="openpyxl")
+    full.add_argument("--fast-layout", action="store_true")
+    full.add_argument("--streaming", action="store_true")
+    add_cache_flags(full)
+    return parser
+
+
+class CommandError(Exception):
+    pass
+
+
+def make_logger(args):
+    def log(msg):
+        if args.verbose: print(msg, file=sys.stderr)
+    return log
+
+
+def extract(extractor, path, args, logger, **options):
+    """ One extractor run through the result cache unless --no-cache. """
+    if not os.path.exists(path): raise CommandError(f"File not found: {path}")
+    if args.no_cache: return extractor(path, logger=logger, **options)
+    from Working import cached_extract
+    return cached_extract(extractor, path, logger=logger, bypass_cache=args.refresh_cache, **options)
+
+
+def tensile_fields(values):
+    """ Tensile tuple -> {field: value} in rule order. """
+    from Working import RULES
+    return {rule.field: value for rule, value in zip(RULES.tensile.rules, values)}
+
+
+def tensile_tuple(values):
+    """ Accepts the {field: value} form written by this CLI, or a plain list. """
+    if isinstance(values, dict):
+        from Working import RULES
+        return tuple(values.get(rule.field) for rule in RULES.tensile.rules)
+    return tuple(values or ())
+
+
+# Blank templates held in memory by long-running processes (MTC_Service workers),
+# keyed by path, mtime and size so an edited template is re-read
+TEMPLATE_CACHE = {}
+TEMPLATE_CACHE_LIMIT = 16
+
+def copy_template(template, target):
+    if not template: return
+    try:
+        st = os.stat(template)
+    except OSError:
+        raise CommandError(f"Template not found: {template}")
+    key = (os.path.abspath(template), st.st_mtime, st.st_size)
+    data = TEMPLATE_CACHE.get(key)
+    if data is None:
+        with open(template, "rb") as f: data = f.read()
+        if len(TEMPLATE_CACHE) >= TEMPLATE_CACHE_LIMIT: TEMPLATE_CACHE.clear()
+        TEMPLATE_CACHE[key] = data
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    with open(target, "wb") as f: f.write(data)
+
+
+def cmd_extract_docx(args, log):
+    from Working import extract_micro_data_from_docx
+    options = {"streaming": True} if args.streaming else {}
+    return {"results": [{"file": path, "micro": extract(extract_micro_data_from_docx, path, args, log, **options)}
+                        for path in args.paths]}
+
+
+def cmd_extract_pdf(args, log):
+    from Working import process_tensile_file, process_hardness_file
+    extractor = process_tensile_file if args.kind == "tensile" else process_hardness_file
+    options = {"fast_layout": True} if args.fast_layout else {}
+    results = []
+    for path in args.paths:
+        values = extract(extractor, path, args, log, **options)
+        results.append({"file": path, args.kind: tensile_fields(values) if args.kind == "tensile" else values})
+    return {"results": results}
+
+
+def write_mtc(excel, values, writer, log, sources=None):
+    from Working import update_excel_mtc, mtc_cell_values
+    micro = values.get("micro") or {}
+    tensile = tensile_tuple(values.get("tensile"))
+    hardness = list(values.get("hardness") or [])
+    if not os.path.exists(excel): raise CommandError(f"Excel file not found: {excel}")
+    update_excel_mtc(excel, micro, tensile, hardness, logger=log, writer=writer, sources=sources, origin="cli")
+    return {"output": excel, "cells": {cell: value for cell, value, _ in mtc_cell_values(micro, tensile, hardness)}}
+
+
+def cmd_fill(args, log):
+    try:
+        if args.data == "-": values = json.loads(args.stdin) if args.stdin is not None else json.load(sys.stdin)
+        else:
+            with open(args.data, encoding="utf-8") as f: values = json.load(f)
+    except (OSError, ValueError) as e:
+        raise CommandError(f"Can't read --data: {e}")
+    values = values.get("values", values)  # Accept the whole output of `full` as well
+    copy_template(args.template, args.excel)
+    return write_mtc(args.excel, values, args.writer, log)
+
+
+def cmd_full(args, log):
+    from Working import extract_micro_data_from_docx, process_tensile_file, process_hardness_file
+    pdf_options = {"fast_layout": True} if args.fast_layout else {}
+    values = {
+        "micro": extract(extract_micro_data_from_docx, args.micro, args, log,
+                         **({"streaming": True} if args.streaming else {})),
+        "tensile": tensile_fields(extract(process_tensile_file, args.tensile, args, log, **pdf_options)),
+        "hardness": extract(process_hardness_file, args.hardness, args, log, **pdf_options),
+    }
+    copy_template(args.template, args.output)
+    sources = {"micro": args.micro, "tensile": args.tensile, "hardness": args.hardness}
+    result = write_mtc(args.output, values, args.writer, log, sources)
+    result["values"] = values
+    return result
+
+
+COMMANDS = {"extract-docx": cmd_extract_docx, "extract-pdf": cmd_extract_pdf, "fill": cmd_fill, "full": cmd_full}
+
+
+def run_command(args, logger=None, stdin=None):
+    """
+    Runs one parsed command in this process and returns (output dict, exit code).
+    stdin stands in for standard input (`fill --data -`) when the command arrives over the service.
+    """
+    from Stage_Timing import TIMINGS, call_with_spans
+    started = time.perf_counter()
+    args.stdin = stdin
+    output = {"command": args.command, "ok": True}
+    exit_code, spans = 0, []
+    try:
+        result, spans = call_with_spans(COMMANDS[args.command], args, logger or make_logger(args))
+        output.update(result)
+    except CommandError as e:
+        output.update(ok=False, error=str(e))
+        exit_code = 1
+    except Exception as e:
+        output.update(ok=False, error=f"{type(e).__name__}: {e}")
+        exit_code = 1
+    TIMINGS.extend(spans)
+
+    stages = {}
+    for record in spans:
+        stage = stages.setdefault(record["stage"], {"runs": 0, "seconds": 0.0})
+        stage["runs"] += 1
+        stage["seconds"] = round(stage["seconds"] + record["seconds"], 4)
+    output["timings"] = {"command_ms": round((time.perf_counter() - started) * 1000, 1), "stages": stages}
+    return output, exit_code
+
+
+def forward_to_server(args, argv):
+    """ Sends the command line (minus --server) to a resident service; returns (output, exit code). """
+    from MTC_Service import ServiceClient, ServiceError
+    forwarded, skip = [], False
+    for arg in argv:
+        if skip: skip = False; continue
+        if arg == "--server": skip = True; continue
+        if arg.startswith("--server="): continue
+        forwarded.append(arg)
+    stdin = None
+    if args.command == "fill" and args.data == "-": stdin = sys.stdin.read()
+    try:
+        response = ServiceClient(args.server).run(forwarded, stdin=stdin)
+    except ServiceError as e:
+        return {"ok": False, "error": f"Service unavailable: {e}"}, 1
+    output = response.get("output") or {"ok": False, "error": response.get("error", "no output")}
+    output["service"] = {"job": response.get("id"), "latency_ms": response.get("latency_ms")}
+    return output, response.get("exit_code", 1)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = build_parser().parse_args(argv)
+    startup_ms = (time.perf_counter() - STARTED) * 1000
+    if args.server: output, exit_code = forward_to_server(args, argv)
+    else: output, exit_code = run_command(args)
+    output.setdefault("timings", {})
+    output["timings"]["startup_ms"] = round(startup_ms, 1)
+    output["timings"]["total_ms"] = round((time.perf_counter() - STARTED) * 1000, 1)
+
+    if args.export_timings and not args.server:
+        from Stage_Timing import export_timings
+        export_timings(logger=lambda msg: print(msg, file=sys.stderr))
+    print(json.dumps(output, ensure_ascii=False, indent=args.indent))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
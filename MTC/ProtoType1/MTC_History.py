@@ -0,0 +1,194 @@
+# ==============================================================================
+# MTC HISTORY
+# Local SQLite store of every value written into an MTC: one job per written
+# workbook, keyed by heat, part, date and the content hashes of its source
+# reports, with one indexed row per value. Quality questions ("nodularity trend
+# for part AF427 since January") read a few indexed rows instead of opening
+# hundreds of workbooks.
+#
+#   python MTC_History.py trend "Graphite Nodularity" --part AF427 --since 2026-01-01
+#   python MTC_History.py heat F326-029
+# ==============================================================================
+
+import os
+import re
+import json
+import time
+import argparse
+from datetime import datetime
+
+from Sqlite_Store import SqliteStore
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".mtc_cache", "mtc_history.sqlite3")
+
+NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def normalize_name(value):
+    """ Heat / part as parse_report_name stores them (stripped, upper-case); None stays None. """
+    return value.strip().upper() if value else value
+
+
+def numeric_value(value):
+    """ First number in a written value ("82%" -> 82.0, "87%/13%" -> 87.0), or None. """
+    match = NUMBER.search(str(value)) if value is not None else None
+    return float(match.group()) if match else None
+
+
+class MTCHistory(SqliteStore):
+    """
+    jobs:    one row per written MTC (heat, part, day, output file, origin, rules version)
+    sources: the job's source reports by kind, with their SHA-256
+    results: (job, field, n) -> written text and its first number; n numbers
+             repeated readings (BHN 1, 2, ...) and is 0 for single values
+    """
+    def __init__(self, db_path=DEFAULT_HISTORY_PATH):
+        super().__init__(db_path)
+        with self.connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")  # Batch / watcher workers append while the UI reads
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY,
+                    heat TEXT NOT NULL,
+                    part TEXT,
+                    recorded REAL NOT NULL,
+                    day TEXT NOT NULL,
+                    output TEXT,
+                    origin TEXT,
+                    rules_version TEXT
+                )""")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_part_day ON jobs (part, day)")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_heat ON jobs (heat, id)")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_day ON jobs (day)")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS sources (
+                    job_id INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    file TEXT,
+                    hash TEXT,
+                    PRIMARY KEY (job_id, kind)
+                ) WITHOUT ROWID""")
+            db.execute("CREATE INDEX IF NOT EXISTS sources_hash ON sources (hash)")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    job_id INTEGER NOT NULL,
+                    field TEXT NOT NULL,
+                    n INTEGER NOT NULL,
+                    cell TEXT,
+                    value TEXT,
+                    number REAL,
+                    PRIMARY KEY (job_id, field, n)
+                ) WITHOUT ROWID""")
+            db.execute("CREATE INDEX IF NOT EXISTS results_field ON results (field, job_id)")
+
+    def record(self, heat, part, rows, sources=None, output=None, origin=None, rules_version=None, recorded=None):
+        """
+        Appends one job. rows are (field, n, cell, value) as from RuleBook.field_values;
+        sources maps kind -> (file name, sha256). Returns the job id.
+        """
+        recorded = time.time() if recorded is None else recorded
+        day = datetime.fromtimestamp(recorded).strftime("%Y-%m-%d")
+        with self.connect() as db:
+            job_id = db.execute(
+                "INSERT INTO jobs (heat, part, recorded, day, output, origin, rules_version) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (heat, part, recorded, day, output, origin, rules_version)).lastrowid
+            db.executemany("INSERT INTO sources VALUES (?, ?, ?, ?)",
+                           [(job_id, kind, name, file_hash) for kind, (name, file_hash) in (sources or {}).items()])
+            db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                           [(job_id, field, n, cell, str(value), numeric_value(value))
+                            for field, n, cell, value in rows])
+        return job_id
+
+    def trend(self, field, part=None, heat=None, since=None, until=None, every_run=False):
+        """
+        Values of one field in time order, as dicts (day, heat, part, n, value, number).
+        since / until are "YYYY-MM-DD" (inclusive). Unless every_run, a heat whose MTC was
+        written more than once only contributes its latest job.
+        """
+        part, heat = normalize_name(part), normalize_name(heat)  # Stored upper-case by parse_report_name
+        where, params = ["r.field = ?"], [field]
+        if part: where.append("j.part = ?"); params.append(part)
+        if heat: where.append("j.heat = ?"); params.append(heat)
+        if since: where.append("j.day >= ?"); params.append(since)
+        if until: where.append("j.day <= ?"); params.append(until)
+        if not every_run: where.append("j.id = (SELECT MAX(id) FROM jobs latest WHERE latest.heat = j.heat)")
+        # With a part / heat the few matching jobs drive the join (CROSS JOIN fixes the order;
+        # without table statistics SQLite would walk every result row of the field instead)
+        join = "CROSS JOIN" if part or heat else "JOIN"
+        query = ("SELECT j.day, j.heat, j.part, r.n, r.value, r.number FROM jobs j "
+                 f"{join} results r ON r.job_id = j.id "
+                 f"WHERE {' AND '.join(where)} ORDER BY j.recorded, j.id, r.n")
+        with self.connect() as db:
+            rows = db.execute(query, params).fetchall()
+        return [dict(zip(("day", "heat", "part", "n", "value", "number"), row)) for row in rows]
+
+    def summary(self, field, part=None, since=None, until=None, every_run=False):
+        """ Count / heats / min / max / mean of the field's numeric values over the same selection as trend(). """
+        rows = self.trend(field, part=part, since=since, until=until, every_run=every_run)
+        numbers = [row["number"] for row in rows if row["number"] is not None]
+        return {
+            "field": field, "part": part, "values": len(rows), "heats": len({row["heat"] for row in rows}),
+            "min": min(numbers) if numbers else None,
+            "max": max(numbers) if numbers else None,
+            "mean": round(sum(numbers) / len(numbers), 3) if numbers else None,
+        }
+
+    def heat_results(self, heat):
+        """ The latest job for a heat: {heat, part, day, output, origin, sources, values}, or None. """
+        heat = normalize_name(heat)
+        with self.connect() as db:
+            job = db.execute("SELECT id, part, day, output, origin FROM jobs WHERE heat = ? ORDER BY id DESC LIMIT 1",
+                             (heat,)).fetchone()
+            if job is None: return None
+            job_id, part, day, output, origin = job
+            sources = {kind: {"file": name, "sha256": file_hash} for kind, name, file_hash in db.execute(
+                "SELECT kind, file, hash FROM sources WHERE job_id = ?", (job_id,))}
+            values = {}
+            for field, n, value in db.execute("SELECT field, n, value FROM results WHERE job_id = ? ORDER BY field, n",
+                                              (job_id,)):
+                if n: values.setdefault(field, []).append(value)
+                else: values[field] = value
+        return {"heat": heat, "part": part, "day": day, "output": output, "origin": origin,
+                "sources": sources, "values": values}
+
+    def jobs_for_file(self, file_hash):
+        """ (job id, heat, day, kind) of every MTC built from a report with this content hash. """
+        with self.connect() as db:
+            return db.execute(
+                "SELECT j.id, j.heat, j.day, s.kind FROM sources s JOIN jobs j ON j.id = s.job_id "
+                "WHERE s.hash = ? ORDER BY j.id", (file_hash,)).fetchall()
+
+    def count(self):
+        with self.connect() as db:
+            return db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+# ==============================================================================
+# MAIN ENTRY POINT
+# ==============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the history of values written into MTCs.")
+    parser.add_argument("--db", default=DEFAULT_HISTORY_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    trend = commands.add_parser("trend", help="one field over time, e.g. \"Graphite Nodularity\"")
+    trend.add_argument("field")
+    trend.add_argument("--part")
+    trend.add_argument("--heat")
+    trend.add_argument("--since", help="YYYY-MM-DD")
+    trend.add_argument("--until", help="YYYY-MM-DD")
+    trend.add_argument("--every-run", action="store_true", help="include superseded MTCs of a heat")
+    heat = commands.add_parser("heat", help="latest values written for a heat")
+    heat.add_argument("heat")
+    args = parser.parse_args()
+
+    history = MTCHistory(args.db)
+    if args.command == "trend":
+        start = time.perf_counter()
+        rows = history.trend(args.field, args.part, args.heat, args.since, args.until, args.every_run)
+        for row in rows:
+            reading = f" #{row['n']}" if row["n"] else ""
+            print(f"{row['day']}  {row['heat']:<12} {row['part'] or '-':<8} {row['value']}{reading}")
+        print(f"{len(rows)} values in {(time.perf_counter() - start) * 1000:.1f} ms")
+    else:
+        print(json.dumps(history.heat_results(args.heat), indent=2, ensure_ascii=False))
@@ -0,0 +1,466 @@
+# ==============================================================================
+# RESIDENT EXTRACTION SERVICE
+# Long-running local HTTP service for the VDI server. Its worker processes load
+# pdfminer, openpyxl, the extraction rules and the MTC templates once and then
+# run MTC_CLI commands as queued jobs, so the UI, the CLI (--server) and batch
+# files no longer pay a cold Python start per document.
+#
+#   python MTC_Service.py --port 8765 --workers 3
+#
+#   POST /jobs         {"argv": ["full", "--micro", ...], "stdin": null, "wait": true}
+#   GET  /jobs/<id>    add ?wait=SECONDS to block until the job is done
+#   DELETE /jobs/<id>  cancel: drops a queued job, kills the worker of a running one
+#   GET  /health       queue depth, workers, uptime, job counts
+#   GET  /metrics      Prometheus text: job latency plus stage timings
+#
+# Binds to 127.0.0.1 only: jobs name local file paths and run as this user.
+# On a shared server other local users can reach that port too, so every
+# request must carry the token from ~/.mtc_cache/service_token (created 0600 by
+# the service, readable only by its owner), and every response proves the
+# token back (HMAC of the request's nonce) so clients don't trust an impostor.
+# ==============================================================================
+
+import os
+import hmac
+import json
+import time
+import uuid
+import hashlib
+import secrets
+import argparse
+import threading
+from collections import OrderedDict, deque
+from Isolated_Pool import IsolatedPool, DEFAULT_TIMEOUT
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_SERVICE_URL = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+TOKEN_PATH = os.path.join(os.path.expanduser("~"), ".mtc_cache", "service_token")
+TOKEN_HEADER = "X-MTC-Token"
+NONCE_HEADER = "X-MTC-Nonce"
+PROOF_HEADER = "X-MTC-Proof"
+
+MAX_QUEUED_JOBS = 200     # submissions beyond this are refused (HTTP 503)
+KEEP_FINISHED_JOBS = 1000  # finished jobs kept for GET /jobs/<id>
+LATENCY_WINDOW = 500       # recent jobs used for the p50 / p95 in /health
+
+
+class ServiceError(OSError):
+    pass
+
+
+def read_token(path=TOKEN_PATH):
+    """ The owner's service token, or None when the file is missing or unreadable. """
+    try:
+        with open(path, encoding="ascii") as f: return f.read().strip() or None
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_token(path=TOKEN_PATH):
+    """ Service side: reuses the token file (tightened to 0600) or creates one; returns the token. """
+    token = read_token(path)
+    if token:
+        os.chmod(path, 0o600)
+        return token
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    token = secrets.token_hex(32)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="ascii") as f: f.write(token)
+    os.replace(temp_path, path)
+    return token
+
+
+def token_proof(token, nonce):
+    return hmac.new(token.encode("ascii"), nonce.encode("ascii", "replace"), hashlib.sha256).hexdigest()
+
+
+# ==============================================================================
+# WORKER SIDE
+# ==============================================================================
+
+def warm_worker():
+    """ Process-pool initializer: pay every import once, before the first job arrives. """
+    import openpyxl
+    import pdfminer.high_level, pdfminer.layout, pdfminer.converter
+    import Working  # Also compiles the extraction rules
+    import MTC_CLI
+
+
+def execute_job(argv, stdin=None):
+    """
+    Runs one MTC_CLI command line in a worker.
+    Returns (output, exit code, log lines, timing spans, start, end).
+    """
+    import MTC_CLI
+    from Stage_Timing import TIMINGS
+    started = time.time()
+    messages = []
+    try:
+        args = MTC_CLI.build_parser().parse_args(argv)
+    except SystemExit:
+        return {"ok": False, "error": f"Invalid arguments: {argv}"}, 2, messages, [], started, time.time()
+    if args.server:
+        return {"ok": False, "error": "--server is not allowed inside a service job"}, 2, messages, [], started, time.time()
+    output, exit_code = MTC_CLI.run_command(args, logger=messages.append, stdin=stdin)
+    return output, exit_code, messages, TIMINGS.drain(), started, time.time()
+
+
+# ==============================================================================
+# SERVICE
+# ==============================================================================
+
+class ExtractionService:
+    """
+    Job table in front of a pool of warm worker processes. Jobs are queued in
+    submission order; each records when it was submitted, started and finished
+    so the queue wait and the run time are reported separately.
+    """
+    def __init__(self, workers=3, max_queued=MAX_QUEUED_JOBS, executor=None, job_timeout=DEFAULT_TIMEOUT):
+        self.workers = workers
+        self.max_queued = max_queued
+        # A job that hangs (e.g. on a malformed PDF) is killed after job_timeout and its worker replaced
+        self.executor = executor or IsolatedPool(workers, timeout=job_timeout, initializer=warm_worker)
+        self.jobs = OrderedDict()
+        self.futures = {}  # job id -> future, until the job is done
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.pending = 0
+        self.started = time.time()
+        self.counts = {"submitted": 0, "succeeded": 0, "failed": 0, "rejected": 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.latency_totals = {"count": 0, "queue_seconds": 0.0, "run_seconds": 0.0, "total_seconds": 0.0}
+
+    def submit(self, argv, stdin=None):
+        """ Queues a command line. Returns the job dict (raises ServiceError when the queue is full). """
+        if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+            raise ValueError("argv must be a list of strings")
+        with self.lock:
+            if self.pending >= self.max_queued:
+                self.counts["rejected"] += 1
+                raise ServiceError(f"Queue full ({self.pending} jobs)")
+            job = {"id": uuid.uuid4().hex[:12], "argv": argv, "state": "queued", "submitted": time.time()}
+            self.jobs[job["id"]] = job
+            self.pending += 1
+            self.counts["submitted"] += 1
+        future = self.executor.submit(execute_job, argv, stdin)
+        with self.lock:
+            if job["state"] == "queued": self.futures[job["id"]] = future
+        future.add_done_callback(lambda f, job_id=job["id"]: self.finish(job_id, f))
+        return job
+
+    def finish(self, job_id, future):
+        finished = time.time()
+        try:
+            output, exit_code, messages, spans, started, ended = future.result()
+        except Exception as e:  # Timed out, worker died, or the job couldn't be pickled
+            output, exit_code, messages, spans, started, ended = (
+                {"ok": False, "error": f"{type(e).__name__}: {e}"}, 1, [], [], finished, finished)
+
+        from Stage_Timing import TIMINGS  # Merge the worker's stage timings for /metrics
+        with self.lock:
+            self.futures.pop(job_id, None)
+            job = self.jobs.get(job_id)
+            if job is None: return
+            queue_s = max(0.0, started - job["submitted"])
+            run_s = max(0.0, ended - started)
+            total_s = max(0.0, finished - job["submitted"])
+            job.update(state="done", output=output, exit_code=exit_code, log=messages, latency_ms={
+                "queue": round(queue_s * 1000, 1), "run": round(run_s * 1000, 1), "total": round(total_s * 1000, 1)})
+            self.pending -= 1
+            self.counts["succeeded" if exit_code == 0 else "failed"] += 1
+            self.latencies.append(total_s)
+            self.latency_totals["count"] += 1
+            self.latency_totals["queue_seconds"] += queue_s
+            self.latency_totals["run_seconds"] += run_s
+            self.latency_totals["total_seconds"] += total_s
+            self.trim_jobs()
+            self.changed.notify_all()
+        TIMINGS.extend(spans)
+
+    def cancel(self, job_id, wait=5.0):
+        """
+        Cancels a queued or running job (its worker is killed and replaced). Returns the
+        job snapshot once it is marked done, or None for an unknown job.
+        """
+        with self.lock:
+            if job_id not in self.jobs: return None
+            future = self.futures.get(job_id)
+        if future is not None:
+            if hasattr(self.executor, "cancel"): self.executor.cancel(future)
+            else: future.cancel()
+        return self.get(job_id, wait=wait)
+
+    def trim_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["state"] == "done"]
+        for job_id in finished[:max(0, len(finished) - KEEP_FINISHED_JOBS)]: del self.jobs[job_id]
+
+    def get(self, job_id, wait=0.0):
+        """ Snapshot of a job, optionally waiting up to `wait` seconds for it to finish. """
+        deadline = time.time() + wait
+        with self.lock:
+            while True:
+                job = self.jobs.get(job_id)
+                if job is None or job["state"] == "done": break
+                remaining = deadline - time.time()
+                if remaining <= 0: break
+                self.changed.wait(remaining)
+            return dict(job) if job else None
+
+    def health(self):
+        with self.lock:
+            recent = sorted(self.latencies)
+            return {
+                "ok": True,
+                "workers": self.workers,
+                "queued": self.pending,
+                "uptime_s": round(time.time() - self.started, 1),
+                "jobs": dict(self.counts),
+                "latency_ms": {
+                    "p50": round(recent[len(recent) // 2] * 1000, 1) if recent else None,
+                    "p95": round(recent[int(len(recent) * 0.95)] * 1000, 1) if recent else None,
+                },
+            }
+
+    def metrics_text(self):
+        from Stage_Timing import prometheus_text
+        with self.lock:
+            totals = dict(self.latency_totals)
+            counts = dict(self.counts)
+            pending = self.pending
+        lines = [
+            "# HELP mtc_service_jobs_total Jobs by outcome.",
+            "# TYPE mtc_service_jobs_total counter",
+        ]
+        lines += [f'mtc_service_jobs_total{{outcome="{outcome}"}} {value}' for outcome, value in counts.items()]
+        lines += [
+            "# HELP mtc_service_queued_jobs Jobs waiting or running.",
+            "# TYPE mtc_service_queued_jobs gauge",
+            f"mtc_service_queued_jobs {pending}",
+            "# HELP mtc_service_job_seconds Job latency by phase (queue wait, run, total).",
+            "# TYPE mtc_service_job_seconds summary",
+        ]
+        for phase in ("queue", "run", "total"):
+            lines.append(f'mtc_service_job_seconds_sum{{phase="{phase}"}} {round(totals[phase + "_seconds"], 6)}')
+            lines.append(f'mtc_service_job_seconds_count{{phase="{phase}"}} {totals["count"]}')
+        return "\n".join(lines) + "\n" + prometheus_text()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+# ==============================================================================
+# HTTP FRONT END
+# ==============================================================================
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, token=None):
+    """ HTTP front end; requests without the token (default: from TOKEN_PATH, created if missing) get 401. """
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    from urllib.parse import urlparse, parse_qs
+    token = token or ensure_token()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass  # Per-job latency is reported in the responses and /metrics instead
+
+        def send_body(self, status, data, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            nonce = self.headers.get(NONCE_HEADER)
+            if nonce: self.send_header(PROOF_HEADER, token_proof(token, nonce))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def send_json(self, status, body):
+            self.send_body(status, json.dumps(body, ensure_ascii=False).encode("utf-8"),
+                           "application/json; charset=utf-8")
+
+        def authorized(self):
+            if hmac.compare_digest(self.headers.get(TOKEN_HEADER, "").encode(), token.encode()): return True
+            self.send_json(401, {"error": f"missing or wrong {TOKEN_HEADER}"})
+            return False
+
+        def do_GET(self):
+            if not self.authorized(): return
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/health": return self.send_json(200, service.health())
+            if url.path == "/metrics":
+                return self.send_body(200, service.metrics_text().encode("utf-8"), "text/plain; version=0.0.4")
+            if url.path.startswith("/jobs/"):
+                try:
+                    wait = float(query.get("wait", ["0"])[0])
+                except ValueError:
+                    return self.send_json(400, {"error": "wait must be a number"})
+                job = service.get(url.path[len("/jobs/"):], wait=min(wait, 300.0))
+                if job is None: return self.send_json(404, {"error": "unknown job"})
+                return self.send_json(200, job)
+            self.send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if not self.authorized(): return
+            if urlparse(self.path).path != "/jobs": return self.send_json(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                job = service.submit(body.get("argv"), body.get("stdin"))
+            except ServiceError as e:
+                return self.send_json(503, {"error": str(e)})
+            except (ValueError, AttributeError) as e:
+                return self.send_json(400, {"error": str(e)})
+            if body.get("wait", True): job = service.get(job["id"], wait=float(body.get("timeout", 300)))
+            self.send_json(200 if job["state"] == "done" else 202, job)
+
+        def do_DELETE(self):
+            if not self.authorized(): return
+            path = urlparse(self.path).path
+            if not path.startswith("/jobs/"): return self.send_json(404, {"error": "not found"})
+            job = service.cancel(path[len("/jobs/"):])
+            if job is None: return self.send_json(404, {"error": "unknown job"})
+            self.send_json(200 if job["state"] == "done" else 202, job)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=3, job_timeout=DEFAULT_TIMEOUT, logger=print):
+    def log(msg):
+        if logger: logger(msg)
+
+    service = ExtractionService(workers, job_timeout=job_timeout)
+    server = make_server(service, host, port)
+    log(f"--- MTC service on http://{host}:{server.server_port} ({workers} warm workers) ---")
+    log(f"Clients authenticate with the token in {TOKEN_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        log("Service stopped.")
+
+
+# ==============================================================================
+# CLIENTS
+# ==============================================================================
+
+class ServiceClient:
+    """
+    Talks to a running service over HTTP, sending the owner's token (default: read
+    from TOKEN_PATH) and refusing responses that don't prove the same token.
+    """
+    def __init__(self, url=DEFAULT_SERVICE_URL, timeout=300.0, token=None):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.token = token or read_token()
+
+    def request(self, method, path, body=None, timeout=None, text=False):
+        """ JSON response of one authenticated request (the decoded body when text). """
+        import urllib.request
+        import urllib.error
+        if not self.token: raise ServiceError(f"No service token ({TOKEN_PATH} missing)")
+        nonce = secrets.token_hex(16)
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method, headers={
+            "Content-Type": "application/json", TOKEN_HEADER: self.token, NONCE_HEADER: nonce})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                proof = response.headers.get(PROOF_HEADER, "")
+                if not hmac.compare_digest(proof.encode(), token_proof(self.token, nonce).encode()):
+                    raise ServiceError(f"{self.url} did not prove the service token; not an MTC service of this user")
+                data = response.read()
+                return data.decode("utf-8") if text else json.loads(data)
+        except urllib.error.HTTPError as e:
+            try:
+                detail = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                detail = e.reason
+            raise ServiceError(f"HTTP {e.code}: {detail}")
+        except ServiceError:
+            raise
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise ServiceError(str(getattr(e, "reason", e)))
+
+    def available(self, timeout=0.5):
+        try:
+            return bool(self.request("GET", "/health", timeout=timeout).get("ok"))
+        except ServiceError:
+            return False
+
+    def submit(self, argv, stdin=None, wait=False):
+        return self.request("POST", "/jobs", {"argv": argv, "stdin": stdin, "wait": wait, "timeout": self.timeout})
+
+    def job(self, job_id, wait=0.0):
+        return self.request("GET", f"/jobs/{job_id}?wait={wait}", timeout=wait + 30)
+
+    def cancel(self, job_id):
+        """ Cancels a queued or running job; returns its final snapshot. """
+        return self.request("DELETE", f"/jobs/{job_id}", timeout=30)
+
+    def run(self, argv, stdin=None):
+        """ Submits and waits. Returns the finished job (output, exit_code, log, latency_ms). """
+        job = self.submit(argv, stdin, wait=True)
+        while job.get("state") != "done": job = self.job(job["id"], wait=30)
+        return job
+
+    def health(self):
+        return self.request("GET", "/health")
+
+    def metrics(self):
+        """ /metrics in the Prometheus text format. """
+        return self.request("GET", "/metrics", text=True)
+
+
+class LocalClient:
+    """
+    Stand-in with the ServiceClient interface that runs jobs in this process,
+    without HTTP or worker processes, for checks and for running without a service.
+    """
+    def __init__(self):
+        self.jobs = {}
+
+    def available(self, timeout=0.0):
+        return True
+
+    def submit(self, argv, stdin=None, wait=False):
+        submitted = time.time()
+        output, exit_code, messages, spans, started, ended = execute_job(argv, stdin)
+        from Stage_Timing import TIMINGS
+        TIMINGS.extend(spans)
+        job = {"id": uuid.uuid4().hex[:12], "argv": argv, "state": "done", "submitted": submitted,
+               "output": output, "exit_code": exit_code, "log": messages,
+               "latency_ms": {"queue": round((started - submitted) * 1000, 1),
+                              "run": round((ended - started) * 1000, 1),
+                              "total": round((time.time() - submitted) * 1000, 1)}}
+        self.jobs[job["id"]] = job
+        return job
+
+    def job(self, job_id, wait=0.0):
+        if job_id not in self.jobs: raise ServiceError("HTTP 404: unknown job")
+        return self.jobs[job_id]
+
+    def cancel(self, job_id):
+        return self.job(job_id)  # Jobs finish inside submit()
+
+    def run(self, argv, stdin=None):
+        return self.submit(argv, stdin, wait=True)
+
+    def health(self):
+        return {"ok": True, "workers": 0, "queued": 0, "jobs": {"submitted": len(self.jobs)}}
+
+
+# ==============================================================================
+# MAIN ENTRY POINT
+# ==============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident MTC extraction service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=max(1, min(4, (os.cpu_count() or 2) - 1)))
+    parser.add_argument("--job-timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds before a running job is killed")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.job_timeout)
@@ -0,0 +1,178 @@
+# ==============================================================================
+# REPORT INDEX
+# Parses report file names like "F305-013-(BE406)-6.docx",
+# "F326-029(AF427)-4(9).pdf" or "F335-023(AF577)-2_ON_CASTING.pdf" into
+# (heat, part, sample) keys and indexes the three report folders by heat and part,
+# so pairing a heat's documents is a dictionary lookup instead of a directory walk.
+# ==============================================================================
+
+import os
+import re
+from collections import namedtuple
+
+# Standard sub-folders of the MTC working directory
+REPORT_FOLDERS = {"micro": "MICRO_REPORT", "tensile": "TENCILE_OG", "hardness": "HARDNESS_OG"}
+REPORT_EXTENSIONS = {"micro": ".docx", "tensile": ".pdf", "hardness": ".pdf"}
+
+REPORT_NAME_PATTERN = re.compile(
+    r"^(?P<heat>F\d+-\d+)\s*-?\s*"          # furnace / heat code
+    r"(?:\((?P<part>[^)]+)\))?\s*-?\s*"     # (part code)
+    r"(?P<sample>\d+(?:\(\d+\))?)?"         # sample, optionally with specimen "(9)"
+    r"[\s_-]*(?P<note>.*)$",                # anything else, e.g. ON_CASTING
+    re.IGNORECASE)
+
+ReportName = namedtuple("ReportName", ["heat", "part", "sample", "note"])
+REPORT_KIND_ORDER = ("micro", "tensile", "hardness")
+
+
+def parse_report_name(filename):
+    """ ReportName for a report file; names that don't follow the pattern use their stem as the heat. """
+    stem = os.path.splitext(os.path.basename(filename))[0].strip()
+    match = REPORT_NAME_PATTERN.match(stem)
+    if not match: return ReportName(stem.upper(), None, None, "")
+    part = match.group("part")
+    return ReportName(match.group("heat").upper(), part.strip().upper() if part else None,
+                      match.group("sample"), match.group("note"))
+
+
+def report_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+def pair_key(heat, part, parts):
+    """ Name of a pairing: the heat, or "HEAT(PART)" when the heat's reports name more than one part. """
+    return f"{heat}({part})" if part and len(parts) > 1 else heat
+
+
+def group_by_part(heat, reports):
+    """
+    One heat's reports grouped into pairings. reports maps kind -> [(path, part, mtime)];
+    returns pair_key -> {kind: (path, part, mtime)}. A report naming no part joins every
+    part's group that has no report of its kind. Several candidates of one kind (re-tests):
+    the newest mtime wins, then the last name, so the choice never depends on listing order.
+    """
+    parts = sorted({part for entries in reports.values() for _, part, _ in entries if part})
+    groups = {}
+    for part in parts or [None]:
+        group = {}
+        for kind, entries in reports.items():
+            candidates = [entry for entry in entries if entry[1] == part] or [entry for entry in entries if not entry[1]]
+            if candidates: group[kind] = max(candidates, key=lambda entry: (entry[2], os.path.basename(entry[0])))
+        groups[pair_key(heat, part, parts)] = group
+    return groups
+
+
+class ReportIndex:
+    """
+    heat -> {kind: [paths]} and part -> {heats} across the report folders.
+    refresh() only rescans a folder whose directory mtime changed, and the scan
+    reads names only (no per-file stat), so it stays cheap with tens of
+    thousands of files on a share.
+    """
+    def __init__(self, micro_dir, tensile_dir, hardness_dir):
+        self.folders = {"micro": micro_dir, "tensile": tensile_dir, "hardness": hardness_dir}
+        self.folder_mtimes = {}
+        self.by_kind = {kind: {} for kind in self.folders}   # kind -> heat -> [paths]
+        self.names = {kind: {} for kind in self.folders}     # kind -> path -> ReportName
+        self.parts = {}                                      # part -> {heats}
+        self.refresh()
+
+    @classmethod
+    def for_base(cls, base_dir):
+        """ Index of the standard MICRO_REPORT / TENCILE_OG / HARDNESS_OG folders under base_dir. """
+        return cls(*(os.path.join(base_dir, REPORT_FOLDERS[kind]) for kind in ("micro", "tensile", "hardness")))
+
+    def refresh(self):
+        """ Rescans changed folders. Returns the kinds that were rescanned. """
+        changed = []
+        for kind, folder in self.folders.items():
+            try:
+                mtime = os.stat(folder).st_mtime
+            except OSError:
+                mtime = None
+            if kind in self.folder_mtimes and self.folder_mtimes[kind] == mtime: continue
+            self.folder_mtimes[kind] = mtime
+            self.scan_folder(kind)
+            changed.append(kind)
+        if changed: self.rebuild_parts()
+        return changed
+
+    def scan_folder(self, kind):
+        folder, extension = self.folders[kind], REPORT_EXTENSIONS[kind]
+        by_heat, names = {}, {}
+        if folder and os.path.isdir(folder):
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if not entry.name.lower().endswith(extension) or entry.name.startswith("~$"): continue
+                    name = parse_report_name(entry.name)
+                    names[entry.path] = name
+                    by_heat.setdefault(name.heat, []).append(entry.path)
+        for paths in by_heat.values(): paths.sort()
+        self.by_kind[kind], self.names[kind] = by_heat, names
+
+    def rebuild_parts(self):
+        self.parts = {}
+        for names in self.names.values():
+            for name in names.values():
+                if name.part: self.parts.setdefault(name.part, set()).add(name.heat)
+
+    def reports_for_heat(self, heat):
+        """ {kind: [paths]} for every report of a heat. """
+        heat = parse_report_name(heat).heat
+        return {kind: list(by_heat[heat]) for kind, by_heat in self.by_kind.items() if heat in by_heat}
+
+    def heats_for_part(self, part):
+        return sorted(self.parts.get(part.strip().upper(), ()))
+
+    def name_of(self, path):
+        for names in self.names.values():
+            if path in names: return names[path]
+        return parse_report_name(path)
+
+    def heat_groups(self, heat):
+        """ group_by_part() over the indexed reports of a heat; only re-tests (several of a kind) are stat'ed. """
+        reports = {}
+        for kind, by_heat in self.by_kind.items():
+            paths = by_heat.get(heat, [])
+            reports[kind] = [(path, self.names[kind][path].part, report_mtime(path) if len(paths) > 1 else 0.0)
+                             for path in paths]
+        return group_by_part(heat, reports)
+
+    def pair(self):
+        """
+        (complete, incomplete): complete maps a pairing (the heat, or "HEAT(PART)" for a heat
+        with several parts) to (micro, tensile, hardness), incomplete maps it to the missing kinds.
+        """
+        complete, incomplete = {}, {}
+        heats = set().union(*(by_heat.keys() for by_heat in self.by_kind.values()))
+        for heat in sorted(heats):
+            for key, group in self.heat_groups(heat).items():
+                missing = [kind for kind in REPORT_KIND_ORDER if kind not in group]
+                if missing: incomplete[key] = missing
+                else: complete[key] = tuple(group[kind][0] for kind in REPORT_KIND_ORDER)
+        return complete, incomplete
+
+    def pair_for(self, path):
+        """ {kind: path} of the pairing a report belongs to (same heat and, when named, part). """
+        name = parse_report_name(path)
+        groups = self.heat_groups(name.heat)
+        group = groups.get(f"{name.heat}({name.part})") or groups.get(name.heat) or next(iter(groups.values()), {})
+        return {kind: entry[0] for kind, entry in group.items()}
+
+
+# ==============================================================================
+# MAIN ENTRY POINT
+# ==============================================================================
+
+if __name__ == "__main__":
+    index = ReportIndex.for_base("/home/johnny/MTCAUTO/MTCAUTO")
+    complete, incomplete = index.pair()
+    print(f"Complete heats: {len(complete)}   Incomplete: {len(incomplete)}")
+    query = input("Heat or part code: ").strip()
+    for heat in index.heats_for_part(query) or [query]:
+        print(heat)
+        for kind, paths in index.reports_for_heat(heat).items():
+            for path in paths: print(f"   {kind:9} {os.path.basename(path)}")
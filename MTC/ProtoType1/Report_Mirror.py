@@ -0,0 +1,110 @@
+# ==============================================================================
+# REPORT MIRROR
+# Copies new or changed report files from the SMB shares into a local cache
+# directory (checked by size + mtime) so the extractors' many small random
+# reads hit local disk instead of the network.
+# ==============================================================================
+
+import os
+import time
+import shutil
+import hashlib
+
+from Report_Index import REPORT_EXTENSIONS
+
+LOCAL_MIRROR_DIR = os.path.join(os.path.expanduser("~"), ".mtc_cache", "mirror")
+
+# Share timestamps can be coarser than local ones (FAT/SMB: up to 2 s)
+MTIME_TOLERANCE = 2.0
+
+
+def new_stats():
+    return {"files": 0, "copied": 0, "skipped": 0, "removed": 0, "bytes_copied": 0, "seconds": 0.0}
+
+
+def mirror_folder_path(src_folder, mirror_dir=LOCAL_MIRROR_DIR):
+    """ Local folder for a share folder; a short hash of the full path keeps same-named folders apart. """
+    src_folder = os.path.abspath(src_folder)
+    digest = hashlib.sha1(os.path.normcase(src_folder).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(mirror_dir, f"{os.path.basename(src_folder)}_{digest}")
+
+
+def is_current(local_path, size, mtime):
+    try:
+        st = os.stat(local_path)
+    except OSError:
+        return False
+    return st.st_size == size and abs(st.st_mtime - mtime) <= MTIME_TOLERANCE
+
+
+def copy_in(src_path, local_path, size, mtime, stats):
+    """ Copies to a temp name first so a reader never sees a half-written mirror file. """
+    if is_current(local_path, size, mtime):
+        stats["skipped"] += 1
+        return
+    tmp_path = local_path + ".part"
+    shutil.copy2(src_path, tmp_path)
+    os.replace(tmp_path, local_path)
+    stats["copied"] += 1
+    stats["bytes_copied"] += size
+
+
+def sync_file(src_path, mirror_dir=LOCAL_MIRROR_DIR, stats=None):
+    """ Mirrors one file and returns its local path. """
+    stats = stats if stats is not None else new_stats()
+    local_folder = mirror_folder_path(os.path.dirname(src_path), mirror_dir)
+    os.makedirs(local_folder, exist_ok=True)
+    local_path = os.path.join(local_folder, os.path.basename(src_path))
+    st = os.stat(src_path)
+    stats["files"] += 1
+    copy_in(src_path, local_path, st.st_size, st.st_mtime, stats)
+    return local_path
+
+
+def sync_folder(src_folder, extension, mirror_dir=LOCAL_MIRROR_DIR, stats=None):
+    """
+    Mirrors every report with the given extension and drops local copies whose
+    source is gone. Returns the local folder.
+    """
+    stats = stats if stats is not None else new_stats()
+    local_folder = mirror_folder_path(src_folder, mirror_dir)
+    os.makedirs(local_folder, exist_ok=True)
+
+    wanted = set()
+    with os.scandir(src_folder) as entries:
+        for entry in entries:
+            if not entry.name.lower().endswith(extension) or entry.name.startswith("~$"): continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            wanted.add(entry.name)
+            stats["files"] += 1
+            copy_in(entry.path, os.path.join(local_folder, entry.name), st.st_size, st.st_mtime, stats)
+
+    for name in os.listdir(local_folder):
+        if name not in wanted:
+            os.remove(os.path.join(local_folder, name))
+            stats["removed"] += 1
+    return local_folder
+
+
+def sync_reports(micro_dir, tensile_dir, hardness_dir, mirror_dir=LOCAL_MIRROR_DIR, logger=print):
+    """ Mirrors the three report folders. Returns ((micro, tensile, hardness) local folders, stats). """
+    def log(msg):
+        if logger: logger(msg)
+
+    stats = new_stats()
+    start = time.perf_counter()
+    local = tuple(sync_folder(folder, REPORT_EXTENSIONS[kind], mirror_dir, stats)
+                  for kind, folder in (("micro", micro_dir), ("tensile", tensile_dir), ("hardness", hardness_dir)))
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    log(format_stats(stats))
+    return local, stats
+
+
+def format_stats(stats):
+    mb = stats["bytes_copied"] / (1024 * 1024)
+    rate = mb / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return (f"Sync: {stats['files']} files, {stats['copied']} copied ({mb:.1f} MB, {rate:.1f} MB/s), "
+            f"{stats['skipped']} unchanged, {stats['removed']} removed in {stats['seconds']}s")
@@ -0,0 +1,240 @@
+# ==============================================================================
+# SPECTROMETER INDEX
+# Ingests the cumulative Spark Analyzer export (SpectroData.xlsx on the
+# SpectroShare) into a local SQLite store keyed by heat number, so filling the
+# chemistry of an MTC is an indexed lookup that never touches the network share.
+# ==============================================================================
+
+import os
+import json
+import hashlib
+import shutil
+from datetime import datetime
+from itertools import islice
+
+import openpyxl
+
+from Working import write_cells
+from Sqlite_Store import SqliteStore
+
+# --- CONFIGURATION ---
+SPECTRO_FILE_PATH = r'\\192.168.1.50\SpectroShare\SpectroData.xlsx'
+SPECTRO_DB_PATH = os.path.join(os.path.expanduser("~"), ".mtc_cache", "spectro_index.sqlite3")
+
+# Header of the heat / sample id column in the export (check the real file: HeatNo, SampleID, Batch...)
+HEAT_COLUMN = "HeatNo"
+
+# Spectro column -> MTC cell (adjust to the real template)
+CHEMISTRY_CELL_MAPPING = {
+    "C": 'C10', "Si": 'D10', "Mn": 'E10',
+    "S": 'F10', "P": 'G10', "Mg": 'H10',
+}
+
+
+def normalize_heat(value):
+    """ Heat numbers come back as text or as floats like 1234.0; compare them as clean text. """
+    if value is None: return ""
+    if isinstance(value, float) and value.is_integer(): value = int(value)
+    return str(value).strip().upper()
+
+
+def clean_value(value):
+    """ JSON-safe cell value (dates become ISO text). """
+    if isinstance(value, datetime): return value.isoformat(sep=" ")
+    return value
+
+
+def row_checksum(row):
+    return hashlib.sha1(json.dumps([clean_value(v) for v in row], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def read_header(rows, heat_column):
+    header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+    if heat_column not in header:
+        raise KeyError(f"Column '{heat_column}' not found in Spectro export")
+    return header
+
+
+class SpectroIndex(SqliteStore):
+    """ Local store of spectrometer burns; every row is kept, lookups return the latest burn of a heat. """
+    def __init__(self, db_path=SPECTRO_DB_PATH):
+        super().__init__(db_path)
+        with self.connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS samples (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source TEXT NOT NULL,
+                    heat TEXT NOT NULL,
+                    source_row INTEGER NOT NULL,
+                    data TEXT NOT NULL
+                )""")
+            db.execute("CREATE INDEX IF NOT EXISTS samples_heat ON samples (heat)")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_state (
+                    source TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    header TEXT NOT NULL,
+                    last_row INTEGER NOT NULL,
+                    last_row_hash TEXT NOT NULL,
+                    prefix_hash TEXT
+                )""")
+            columns = {row[1] for row in db.execute("PRAGMA table_info(ingest_state)")}
+            if "prefix_hash" not in columns:  # Stores from before the prefix check: next ingest_new rebuilds
+                db.execute("ALTER TABLE ingest_state ADD COLUMN prefix_hash TEXT")
+
+    def ingest(self, xlsx_path=SPECTRO_FILE_PATH, heat_column=HEAT_COLUMN, logger=None):
+        """
+        Rebuilds the rows of one export from scratch. The file is read once, row by row,
+        with openpyxl's read-only mode. Returns the number of rows stored.
+        """
+        def log(msg):
+            if logger: logger(msg)
+
+        log(f"--- Ingesting Spectro export: {os.path.basename(xlsx_path)} ---")
+        stat = os.stat(xlsx_path)
+        wb = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = read_header(rows, heat_column)
+            prefix = hashlib.sha1()
+            records, last_row, last_hash = self.collect_records(rows, header, heat_column, 2, prefix)
+        finally:
+            wb.close()
+
+        with self.connect() as db:
+            db.execute("DELETE FROM samples WHERE source = ?", (xlsx_path,))
+            db.executemany("INSERT INTO samples (source, heat, source_row, data) VALUES (?, ?, ?, ?)",
+                           [(xlsx_path,) + record for record in records])
+            self.save_state(db, xlsx_path, stat, header, last_row, last_hash, prefix.hexdigest())
+        log(f"Indexed {len(records)} spectro rows.")
+        return len(records)
+
+    def ingest_new(self, xlsx_path=SPECTRO_FILE_PATH, heat_column=HEAT_COLUMN, logger=None):
+        """
+        Appends only the rows added since the last ingest. Nothing is read when
+        size and mtime are unchanged. The already ingested rows are re-hashed
+        (a running checksum over every row, no JSON or database work) and a
+        changed header, edited or deleted row falls back to a full ingest.
+        Returns the number of new rows stored.
+        """
+        def log(msg):
+            if logger: logger(msg)
+
+        stat = os.stat(xlsx_path)
+        with self.connect() as db:
+            state = db.execute("SELECT size, mtime, header, last_row, last_row_hash, prefix_hash FROM ingest_state "
+                               "WHERE source = ?", (xlsx_path,)).fetchone()
+        if state is None or state[5] is None: return self.ingest(xlsx_path, heat_column, logger)
+
+        size, mtime, header_json, last_row, last_hash, prefix_hash = state
+        if stat.st_size == size and stat.st_mtime == mtime:
+            log("Spectro index is up to date.")
+            return 0
+
+        wb = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
+        try:
+            ws = wb.active
+            header = read_header(ws.iter_rows(max_row=1, values_only=True), heat_column)
+            rewritten = header != json.loads(header_json)
+            rows = ws.iter_rows(min_row=2, values_only=True)
+            prefix = hashlib.sha1()
+            if not rewritten:
+                # Every ingested row must hash the same as when it was stored
+                seen = 0
+                for row in islice(rows, last_row - 1):
+                    prefix.update(row_checksum(row).encode("ascii"))
+                    seen += 1
+                rewritten = seen != last_row - 1 or prefix.hexdigest() != prefix_hash
+            if not rewritten:
+                records, last_row, last_hash = self.collect_records(rows, header, heat_column, last_row + 1, prefix,
+                                                                    last_hash)
+        finally:
+            wb.close()
+
+        if rewritten:
+            log("Spectro export was rewritten; rebuilding index.")
+            return self.ingest(xlsx_path, heat_column, logger)
+
+        with self.connect() as db:
+            db.executemany("INSERT INTO samples (source, heat, source_row, data) VALUES (?, ?, ?, ?)",
+                           [(xlsx_path,) + record for record in records])
+            self.save_state(db, xlsx_path, stat, header, last_row, last_hash, prefix.hexdigest())
+        log(f"Indexed {len(records)} new spectro rows.")
+        return len(records)
+
+    def collect_records(self, rows, header, heat_column, first_row_number, prefix, last_hash=""):
+        """
+        (records, last_row_number, last_row_checksum) for the rows of an export;
+        each row's checksum is also fed into the running prefix hash.
+        """
+        heat_at = header.index(heat_column)
+        records, last_row = [], first_row_number - 1
+        for row_number, row in enumerate(rows, start=first_row_number):
+            last_row, last_hash = row_number, row_checksum(row)
+            prefix.update(last_hash.encode("ascii"))
+            heat = normalize_heat(row[heat_at] if heat_at < len(row) else None)
+            if not heat: continue
+            data = {name: clean_value(value) for name, value in zip(header, row) if name}
+            records.append((heat, row_number, json.dumps(data, ensure_ascii=False)))
+        return records, last_row, last_hash
+
+    def save_state(self, db, xlsx_path, stat, header, last_row, last_hash, prefix_hash):
+        db.execute("INSERT OR REPLACE INTO ingest_state VALUES (?, ?, ?, ?, ?, ?, ?)",
+                   (xlsx_path, stat.st_size, stat.st_mtime, json.dumps(header), last_row, last_hash, prefix_hash))
+
+    def lookup(self, heat):
+        """ Latest burn for a heat as {column: value}, or None. """
+        with self.connect() as db:
+            row = db.execute("SELECT data FROM samples WHERE heat = ? ORDER BY id DESC LIMIT 1",
+                             (normalize_heat(heat),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self):
+        with self.connect() as db:
+            return db.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+
+
+def chemistry_cell_values(sample, mapping=CHEMISTRY_CELL_MAPPING):
+    """ {cell: value} for every mapped element present in a spectro sample. """
+    return {cell: sample[column] for column, cell in mapping.items() if sample.get(column) is not None}
+
+
+def generate_mtc(target_heat_number, template_path, output_folder, index=None, writer="openpyxl", logger=print):
+    """ Copies the blank template and fills heat no, date and chemistry from the local index. """
+    def log(msg):
+        if logger: logger(msg)
+
+    index = index or SpectroIndex()
+    sample = index.lookup(target_heat_number)
+    if sample is None:
+        log(f"Error: Heat Number {target_heat_number} not found in the Spectro index.")
+        return None
+
+    values = {
+        'B5': normalize_heat(target_heat_number),
+        'B6': datetime.today().strftime('%Y-%m-%d'),
+    }
+    values.update(chemistry_cell_values(sample))
+
+    os.makedirs(output_folder, exist_ok=True)
+    save_path = os.path.join(output_folder, f"MTC_{normalize_heat(target_heat_number)}.xlsx")
+    shutil.copyfile(template_path, save_path)
+    write_cells(save_path, values, writer, logger=logger)
+    log(f"Success! MTC generated at: {save_path}")
+    return save_path
+
+
+# ==============================================================================
+# MAIN ENTRY POINT
+# ==============================================================================
+
+if __name__ == "__main__":
+    TEMPLATE_PATH = r'C:\Users\Admin\Documents\Templates\Acumelt_MTC_Blank.xlsx'
+    OUTPUT_FOLDER = r'C:\Users\Admin\Documents\Generated_MTCs'
+
+    index = SpectroIndex()
+    if input("Pull new burns from the share first? (y/N): ").strip().lower() == "y":
+        index.ingest_new(logger=print)
+    user_input = input("Please enter the Heat Number to generate MTC: ")
+    generate_mtc(user_input, TEMPLATE_PATH, OUTPUT_FOLDER, index=index)
@@ -0,0 +1,25 @@
+# ==============================================================================
+# SQLITE STORE
+# Base of the local SQLite stores under ~/.mtc_cache (extraction cache,
+# spectro index, MTC history): one file per store, opened per operation.
+# ==============================================================================
+
+import os
+import sqlite3
+from contextlib import contextmanager
+
+
+class SqliteStore:
+    """ Creates the database folder on demand; connect() yields a short-lived connection. """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+    @contextmanager
+    def connect(self):
+        """ Connection that commits on success and is always closed. """
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with db: yield db
+        finally:
+            db.close()
@@ -0,0 +1,181 @@
+# ==============================================================================
+# STAGE TIMING
+# Structured timing spans around the expensive pipeline stages (DOCX unzip /
+# parse, PDF layout, neighbor search, workbook load / save). Spans carry the
+# file name and size, are collected in-process, and can be exported as JSON
+# lines or as a Prometheus textfile (node_exporter textfile collector format).
+# ==============================================================================
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+TIMINGS_DIR = os.path.join(os.path.expanduser("~"), ".mtc_cache", "timings")
+DEFAULT_JSONL_PATH = os.path.join(TIMINGS_DIR, "spans.jsonl")
+DEFAULT_PROM_PATH = os.path.join(TIMINGS_DIR, "mtc_stages.prom")
+
+# Recent spans kept in memory; per-stage totals are kept separately and never drop
+MAX_SPANS = 50000
+
+
+class SpanCollector:
+    """
+    Thread-safe store of finished spans plus cumulative per-stage totals
+    (count, seconds, bytes, errors), so the Prometheus export stays correct
+    for a whole shift even after old spans fall out of the ring buffer.
+    """
+    def __init__(self, max_spans=MAX_SPANS):
+        self.lock = threading.Lock()
+        self.spans = deque(maxlen=max_spans)
+        self.totals = {}
+        self.added = 0      # spans ever added (the ring buffer keeps only the latest)
+        self.exported = 0   # value of `added` at the last JSON-lines export
+
+    def add(self, span):
+        with self.lock:
+            self.spans.append(span)
+            self.added += 1
+            total = self.totals.setdefault(span["stage"], {"count": 0, "seconds": 0.0, "bytes": 0, "errors": 0})
+            total["count"] += 1
+            total["seconds"] += span["seconds"]
+            total["bytes"] += span.get("size_bytes") or 0
+            if span.get("error"): total["errors"] += 1
+
+    def extend(self, spans):
+        for span in spans: self.add(span)
+
+    def drain(self):
+        """ Removes and returns all buffered spans (used to ship spans out of worker processes). """
+        with self.lock:
+            spans = list(self.spans)
+            self.spans.clear()
+            self.totals = {}
+            self.added = self.exported = 0
+        return spans
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.spans), {stage: dict(total) for stage, total in self.totals.items()}
+
+    def clear(self):
+        self.drain()
+
+
+TIMINGS = SpanCollector()
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return None
+
+
+@contextmanager
+def span(stage, path=None, collector=None, **attrs):
+    """
+    Times the with-block as one span of `stage`. Yields the span dict so the
+    block can attach extra fields (element counts, writer used, ...).
+    Exceptions are recorded on the span and re-raised.
+    """
+    record = {
+        "stage": stage,
+        "file": os.path.basename(path) if path else None,
+        "size_bytes": file_size(path) if path else None,
+        "pid": os.getpid(),
+        "started": datetime.now().isoformat(timespec="milliseconds"),
+    }
+    record.update(attrs)
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 6)
+        (collector or TIMINGS).add(record)
+
+
+def call_with_spans(func, *args, **kwargs):
+    """
+    Runs func in a worker process and returns (result, spans recorded during the call),
+    so the parent can merge them with TIMINGS.extend().
+    """
+    TIMINGS.clear()
+    try:
+        return func(*args, **kwargs), TIMINGS.drain()
+    finally:
+        TIMINGS.clear()
+
+
+# ==============================================================================
+# EXPORT
+# ==============================================================================
+
+def export_jsonl(path=DEFAULT_JSONL_PATH, collector=None):
+    """ Appends spans not yet exported to a JSON-lines file. Returns the number written. """
+    collector = collector or TIMINGS
+    with collector.lock:
+        # Spans that fell out of the ring buffer before an export are lost from the file
+        pending = min(collector.added - collector.exported, len(collector.spans))
+        new = list(collector.spans)[len(collector.spans) - pending:]
+        collector.exported = collector.added
+    if not new: return 0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in new: f.write(json.dumps(record) + "\n")
+    return len(new)
+
+
+def prometheus_text(collector=None):
+    """ Per-stage cumulative counters in Prometheus exposition format. """
+    _, totals = (collector or TIMINGS).snapshot()
+    lines = []
+    metrics = (
+        ("mtc_stage_runs_total", "counter", "Number of timed runs per pipeline stage.", "count"),
+        ("mtc_stage_seconds_total", "counter", "Total seconds spent per pipeline stage.", "seconds"),
+        ("mtc_stage_bytes_total", "counter", "Total input file bytes processed per pipeline stage.", "bytes"),
+        ("mtc_stage_errors_total", "counter", "Runs per pipeline stage that raised.", "errors"),
+    )
+    for name, kind, help_text, field in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for stage in sorted(totals):
+            value = totals[stage][field]
+            lines.append(f'{name}{{stage="{stage}"}} {round(value, 6) if field == "seconds" else value}')
+    return "\n".join(lines) + "\n"
+
+
+def export_prometheus(path=DEFAULT_PROM_PATH, collector=None):
+    """ Rewrites the textfile atomically so a scraper never reads a partial file. """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(collector))
+    os.replace(tmp_path, path)
+
+
+def export_timings(jsonl_path=DEFAULT_JSONL_PATH, prom_path=DEFAULT_PROM_PATH, collector=None, logger=None):
+    """ Flushes new spans to the JSON-lines file and refreshes the Prometheus textfile. """
+    try:
+        written = export_jsonl(jsonl_path, collector)
+        export_prometheus(prom_path, collector)
+    except OSError as e:
+        if logger: logger(f"Timing export failed: {e}")
+        return 0
+    return written
+
+
+def summarize(collector=None):
+    """ Lines like 'pdf_layout: 12 runs, 3.412s total, 284.3 ms avg' for logs. """
+    _, totals = (collector or TIMINGS).snapshot()
+    lines = []
+    for stage, total in sorted(totals.items(), key=lambda item: -item[1]["seconds"]):
+        avg_ms = total["seconds"] / total["count"] * 1000 if total["count"] else 0.0
+        lines.append(f"{stage}: {total['count']} runs, {total['seconds']:.3f}s total, {avg_ms:.1f} ms avg")
+    return lines
@@ -0,0 +1,185 @@
+# ==============================================================================
+# SYNTHETIC CORPUS
+# Generates realistic stand-ins for micro DOCX reports, tensile / hardness PDFs
+# and MTC templates, sized by a few knobs, for benchmarking the pipeline
+# without real customer documents.
+# ==============================================================================
+
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+import openpyxl
+from openpyxl.styles import Font, PatternFill, Border, Side
+
+from Report_Index import REPORT_FOLDERS
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>')
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/></Relationships>')
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+FILLER_WORDS = ("sample taken from casting section polished etched observed at 100x magnification "
+                "field graphite matrix nodules counted per image analysis standard ASTM E2567").split()
+
+
+def micro_summary_rows(rng):
+    return [
+        ("Graphite Nodularity", [f"{rng.randint(80, 95)}%"]),
+        ("Nodular Particles per mm²", [f"{rng.randint(120, 300)}."]),
+        ("Graphite Size", [str(rng.randint(5, 8))]),
+        ("Graphite Form", [f"VI ({rng.randint(85, 95)}%)"]),
+        ("Graphite Fraction", [str(rng.randint(8, 14)), "%"]),
+    ]
+
+
+def docx_paragraph(*texts):
+    runs = "".join(f"<w:r><w:t>{escape(t)}</w:t></w:r>" for t in texts)
+    return f"<w:p>{runs}</w:p>"
+
+
+def docx_table(rows):
+    body = "".join("<w:tr>" + "".join(f"<w:tc>{docx_paragraph(*cell)}</w:tc>" for cell in row) + "</w:tr>"
+                   for row in rows)
+    return f"<w:tbl>{body}</w:tbl>"
+
+
+def write_micro_docx(path, appendix_chunks=200, seed=0):
+    """
+    Micro report laid out like the real ones: ratio in the opening section, a
+    provisional table, a long appendix and the final results table at the end.
+    """
+    rng = random.Random(seed)
+    ferrite = rng.randint(60, 90)
+    parts = [docx_paragraph("Microstructure Report"),
+             docx_table([[("Ferrite / Pearlite Ratio",), (f"{ferrite}%", "/", f"{100 - ferrite}%")]]),
+             docx_table([[(label,), ("",)] for label, _ in micro_summary_rows(rng)])]
+    for _ in range(appendix_chunks):
+        parts.append(docx_paragraph(" ".join(rng.choices(FILLER_WORDS, k=rng.randint(3, 12)))))
+    parts.append(docx_table([[(label,), tuple(values)] for label, values in micro_summary_rows(rng)]))
+
+    document = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                f'<w:document xmlns:w="{W_NS}"><w:body>{"".join(parts)}</w:body></w:document>')
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        docx.writestr("_rels/.rels", DOCX_RELS)
+        docx.writestr("word/document.xml", document)
+
+
+def pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages):
+    """ Minimal PDF with Helvetica text; pages is a list of [(text, x, y), ...]. """
+    objects = ["<</Type/Catalog/Pages 2 0 R>>", None, "<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>"]
+    kids = []
+    for items in pages:
+        stream = "".join(f"BT /F1 9 Tf {x:.1f} {y:.1f} Td ({pdf_escape(text)}) Tj ET\n" for text, x, y in items)
+        objects.append(f"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]"
+                       f"/Resources<</Font<</F1 3 0 R>>>>/Contents {len(objects) + 2} 0 R>>")
+        kids.append(f"{len(objects)} 0 R")
+        objects.append(f"<</Length {len(stream.encode('latin-1'))}>>stream\n{stream}endstream")
+    objects[1] = f"<</Type/Pages/Kids[{' '.join(kids)}]/Count {len(kids)}>>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer<</Size {len(objects) + 1}/Root 1 0 R>>\nstartxref\n{xref_at}\n%%EOF".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def filler_items(rng, count, y_top=560, y_bottom=60):
+    """ Body text lines below the result rows: specimen data, notes, machine info. """
+    items = []
+    for i in range(count):
+        y = y_top - (i % 50) * ((y_top - y_bottom) / 50)
+        x = 40 + (i // 50) * 140 % 500
+        items.append((" ".join(rng.choices(FILLER_WORDS, k=3)) + f" {rng.uniform(0, 99):.2f}", x, y))
+    return items
+
+
+def report_pages(rng, items, filler, pages, results_page):
+    """ Result rows on page `results_page` (multi-specimen reports put them after cover / specimen pages). """
+    result = [filler_items(rng, filler, 760) for _ in range(pages)]
+    result[min(results_page, pages - 1)] = items
+    return result
+
+
+def write_tensile_pdf(path, filler=150, pages=1, seed=0, results_page=0):
+    rng = random.Random(seed)
+    items = [("TENSILE TEST REPORT", 220, 760),
+             ("Tensile Strength", 50, 700), (f"{rng.randint(420, 620)} Mpa", 300, 700),
+             ("Yield Strength", 50, 680), (f"{rng.randint(280, 400)} Mpa", 300, 680),
+             ("Elongation", 50, 660), (f"{rng.uniform(8, 18):.1f} %", 300, 660)]
+    items += filler_items(rng, filler)
+    write_pdf(path, report_pages(rng, items, filler, pages, results_page))
+
+
+def write_hardness_pdf(path, readings=2, filler=150, pages=1, seed=0, results_page=0):
+    """ Hardness sheet with one "Hardness" row per reading (dense mapping sheets use many). """
+    rng = random.Random(seed)
+    items = [("BRINELL HARDNESS REPORT", 200, 760)]
+    row_height = min(20.0, 560.0 / max(readings, 1))
+    for i in range(readings):
+        y = 720 - i * row_height
+        items.append((f"Hardness {i + 1}", 50, y))
+        items.append((f"{rng.uniform(2.1, 2.6):.3f} mm  {rng.uniform(160, 230):.1f} HBW", 300, y))
+    items += filler_items(rng, filler, y_top=720 - readings * row_height - 20)
+    write_pdf(path, report_pages(rng, items, filler, pages, results_page))
+
+
+def write_template(path, rows=60, columns=21):
+    """ MTC-like template: labelled grid, styled cells and the merged T:U result ranges. """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "MTC"
+    thin = Side(style="thin")
+    for r in range(1, rows + 1):
+        for c in range(1, columns + 1):
+            cell = ws.cell(row=r, column=c)
+            if c in (1, 2) or r < 5: cell.value = f"Field {r}.{c}"
+            cell.border = Border(top=thin, bottom=thin, left=thin, right=thin)
+    ws["A1"].font = Font(bold=True, size=16)
+    ws["A1"].fill = PatternFill("solid", fgColor="DDEEFF")
+    for r in range(36, 42): ws.merge_cells(f"T{r}:U{r}")
+    wb.save(path)
+
+
+def generate_corpus(base_dir, heats=10, appendix_chunks=200, pdf_filler=150, hardness_readings=2,
+                    pdf_pages=1, template_rows=60, results_page=0):
+    """
+    Writes MICRO_REPORT / TENCILE_OG / HARDNESS_OG folders with `heats` paired
+    reports plus template.xlsx under base_dir. Returns the template path.
+    """
+    for folder in REPORT_FOLDERS.values():
+        os.makedirs(os.path.join(base_dir, folder), exist_ok=True)
+    for i in range(heats):
+        heat = f"F{300 + i}-{i % 40:03d}"
+        part = f"AF{400 + i % 200}"
+        write_micro_docx(os.path.join(base_dir, REPORT_FOLDERS["micro"], f"{heat}-({part})-6.docx"),
+                         appendix_chunks, seed=i)
+        write_tensile_pdf(os.path.join(base_dir, REPORT_FOLDERS["tensile"], f"{heat}({part})-4(9).pdf"),
+                          pdf_filler, pdf_pages, seed=i, results_page=results_page)
+        write_hardness_pdf(os.path.join(base_dir, REPORT_FOLDERS["hardness"], f"{heat}({part})-2_ON_CASTING.pdf"),
+                           hardness_readings, pdf_filler, pdf_pages, seed=i, results_page=results_page)
+    template_path = os.path.join(base_dir, "template.xlsx")
+    write_template(template_path, template_rows)
+    return template_path
@@ -1,196 +1,355 @@
-import tkinter as tk
-from tkinter import filedialog, ttk, messagebox, scrolledtext
 import threading
+import multiprocessing
 import os
-import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import sqlite3
 import zipfile
 import xml.etree.ElementTree as ET
-import openpyxl
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer
+# openpyxl and pdfminer are imported inside the functions that use them: together
+# they are most of this module's import time, and a DOCX-only or write-only run
+# (CLI, workers) shouldn't pay for them.
+from Extraction_Cache import ExtractionCache, file_sha256
+from MTC_History import MTCHistory
+from Xlsx_Patch_Writer import patch_xlsx_cells, strip_illegal_chars, XlsxPatchError
+from Report_Index import ReportIndex, parse_report_name
+from Report_Mirror import sync_file, new_stats, format_stats
+from Stage_Timing import TIMINGS, span, call_with_spans, export_timings
+from Log_Sink import LogSink, FRAME_MS
+from Isolated_Pool import (IsolatedPool, ExtractionTimeout, ExtractionCancelled, WorkerDied, DEFAULT_TIMEOUT,
+                           in_pool_worker)
+from Extraction_Rules import DEFAULT_RULES, LABEL_NOT_FOUND, load_rules
 
 # ==============================================================================
 # PART 1: BACKEND LOGIC (Updated with Logger Callbacks)
 # ==============================================================================
 
-def extract_micro_data_from_docx(docx_path, logger=None):
-    """ Extracts microstructure values from a DOCX file. """
+# Label/value rules shared by every entry point; MTC_RULES_FILE points at a
+# customer rules JSON (see Extraction_Rules.load_rules)
+RULES = load_rules(os.environ["MTC_RULES_FILE"]) if os.environ.get("MTC_RULES_FILE") else DEFAULT_RULES
+
+# Bump whenever the engine changes; rule edits change the fingerprint, so cached results are re-extracted
+EXTRACTOR_RULES_VERSION = f"3.{RULES.fingerprint}"
+
+# Label -> which occurrence holds the result ('last' summary table, 'first' opening-section ratio)
+MICRO_TARGET_LABELS = dict(RULES.micro.targets)
+MICRO_NEIGHBOR_WINDOW = RULES.micro.window
+
+def iter_docx_text_chunks(docx_path):
+    """
+    Lazily yields the stripped w:t texts of a DOCX using iterparse.
+    Parsed elements are cleared as soon as they end, so memory stays bounded
+    by the deepest paragraph/table rather than the document size.
+    """
+    with zipfile.ZipFile(docx_path) as docx:
+        with docx.open('word/document.xml') as stream:
+            depth = 0
+            body = None
+            for event, elem in ET.iterparse(stream, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 2: body = elem
+                    continue
+                depth -= 1
+                if elem.tag.endswith('}t') and elem.text and elem.text.strip():
+                    yield elem.text.strip()
+                elem.clear()
+                if depth == 2 and body is not None:
+                    del body[:]  # Drop finished top-level paragraphs/tables
+
+def extract_micro_data_from_docx(docx_path, logger=None, streaming=False):
+    """
+    Extracts microstructure values from a DOCX file.
+    streaming=True parses document.xml incrementally instead of loading it whole.
+    """
     def log(msg):
         if logger: logger(msg)
 
     results = {}
     log(f"--- Scanning DOCX: {os.path.basename(docx_path)} ---")
 
-    try:
-        if not os.path.exists(docx_path): 
-            log("Error: DOCX File not found.")
-            return results
-        with zipfile.ZipFile(docx_path) as docx:
-            xml_content = docx.read('word/document.xml')
-    except Exception as e:
-        log(f"Error reading DOCX: {e}")
+    if not os.path.exists(docx_path): 
+        log("Error: DOCX File not found.")
         return results
 
-    tree = ET.fromstring(xml_content)
-    all_text_chunks = []
-    for elem in tree.iter():
-        if elem.tag.endswith('}t'):
-            if elem.text and elem.text.strip():
-                all_text_chunks.append(elem.text.strip())
-
-    target_labels = {
-        "Graphite Nodularity": "last", "Nodular Particles per mm²": "last",
-        "Graphite Size": "last", "Graphite Form": "last",
-        "Graphite Fraction": "last", "Ferrite / Pearlite Ratio": "first"
-    }
-    
-    for label, preference in target_labels.items():
-        target_index = -1
-        found_value = None
-        
-        # Search strategy
-        if preference == "last":
-            for i, chunk in enumerate(all_text_chunks):
-                if label.lower() in chunk.lower(): target_index = i
-        elif preference == "first":
-            for i, chunk in enumerate(all_text_chunks):
-                if label.lower() in chunk.lower(): 
-                    target_index = i
-                    break
-
-        if target_index != -1:
-            neighbors = all_text_chunks[target_index+1:target_index+6]
-            if label == "Graphite Fraction":
-                for j, n in enumerate(neighbors):
-                    if "%" in n and any(c.isdigit() for c in n):
-                        found_value = n; break
-                    if any(c.isdigit() for c in n) and j+1 < len(neighbors) and neighbors[j+1] == "%":
-                        found_value = f"{n}{neighbors[j+1]}"; break
-            elif label == "Graphite Form":
-                for n in neighbors:
-                     if "(" in n and ")" in n: found_value = n; break
-            elif label == "Ferrite / Pearlite Ratio":
-                combined = "".join(neighbors[0:3])
-                match = re.search(r"(\d+\.?\d*%\s*/\s*\d+\.?\d*%)", combined)
-                if match: found_value = match.group(1)
-            elif label == "Graphite Nodularity":
-                for n in neighbors:
-                    if "%" in n and len(n) > 1: found_value = n; break
-            elif label in ["Nodular Particles per mm²", "Graphite Size"]:
-                for n in neighbors:
-                    if any(c.isdigit() for c in n) and not n.endswith('%'):
-                        found_value = re.sub(r'[\s\.\,]+$', '', n); break
-            
-            if found_value: 
-                results[label] = found_value
-                log(f"[FOUND] {label}: {found_value}")
-            else:
-                log(f"[MISSING] {label}")
+    if streaming:
+        try:
+            with span("docx_stream_parse", docx_path):
+                windows = RULES.micro.windows_from_stream(iter_docx_text_chunks(docx_path))
+        except Exception as e:
+            log(f"Error reading DOCX: {e}")
+            return results
+    else:
+        try:
+            with span("docx_unzip", docx_path):
+                with zipfile.ZipFile(docx_path) as docx:
+                    xml_content = docx.read('word/document.xml')
+        except Exception as e:
+            log(f"Error reading DOCX: {e}")
+            return results
+
+        with span("docx_parse", docx_path, xml_bytes=len(xml_content)):
+            tree = ET.fromstring(xml_content)
+            all_text_chunks = []
+            for elem in tree.iter():
+                if elem.tag.endswith('}t'):
+                    if elem.text and elem.text.strip():
+                        all_text_chunks.append(elem.text.strip())
+
+        windows = RULES.micro.windows_from_chunks(all_text_chunks)
+
+    for rule, found_value in RULES.micro.pick(windows):
+        if found_value: 
+            results[rule.field] = found_value
+            log(f"[FOUND] {rule.field}: {found_value}")
+        else:
+            log(f"[MISSING] {rule.field}")
                 
     return results
 
-def find_value_neighbor(elements, label_text, required_keyword="Mpa"):
-    label_bbox = None
-    for element in elements:
-        if label_text in element.get_text():
-            label_bbox = element.bbox; break    
-    if not label_bbox: return "Label Not Found"
-
-    lx0, ly0, lx1, ly1 = label_bbox
-    best_candidate_text = None
-    closest_distance = 9999
-    
-    for element in elements:
-        text = element.get_text().strip()
-        ex0, ey0, ex1, ey1 = element.bbox
-        if label_text in text: continue
-        
-        if (ey0 < ly1 + 2) and (ey1 > ly0 - 2) and (ex0 >= lx0 - 5) and (required_keyword in text):
-            distance = ex0 - lx1
-            if distance < closest_distance:
-                closest_distance = distance
-                best_candidate_text = text
-    return best_candidate_text
-
-def extract_number_only(text):
-    if not text: return None
-    match = re.search(r"([\d\.]+)", text)
-    if match: return match.group(1)
-    return text
-
-def process_tensile_file(pdf_path, logger=None):
+# Same grouping thresholds as pdfminer's default LAParams
+LINE_OVERLAP = 0.5
+CHAR_MARGIN = 2.0
+WORD_MARGIN = 0.1
+
+class TextLine:
+    """
+    Text and bbox of one text box / line: all the extractors keep of a page.
+    Pages are reduced to these as soon as they are laid out, so the LTChar tree
+    behind each LTTextContainer is freed and get_text() runs once per box.
+    """
+    __slots__ = ("text", "bbox")
+
+    def __init__(self, text, bbox):
+        self.text = text
+        self.bbox = bbox
+
+    def get_text(self):
+        return self.text
+
+def iter_layout_chars(layout):
+    from pdfminer.layout import LTChar, LTFigure
+    for obj in layout:
+        if isinstance(obj, LTChar): yield obj
+        elif isinstance(obj, LTFigure): yield from iter_layout_chars(obj)
+
+def group_chars_into_lines(chars):
+    """
+    Joins consecutive chars into lines the way pdfminer's group_objects does
+    (horizontal alignment only), skipping textbox grouping and reading-order analysis.
+    """
+    lines = []
+    text, bbox, prev = [], None, None
+    for char in chars:
+        if prev is not None:
+            aligned = (
+                prev.is_voverlap(char)
+                and min(prev.height, char.height) * LINE_OVERLAP < prev.voverlap(char)
+                and prev.hdistance(char) < max(prev.width, char.width) * CHAR_MARGIN
+            )
+            if not aligned:
+                lines.append(TextLine("".join(text) + "\n", tuple(bbox)))
+                text, bbox = [], None
+            elif prev.x1 < char.x0 - WORD_MARGIN * max(char.width, char.height):  # As LTTextLineHorizontal.add
+                text.append(" ")
+        text.append(char.get_text())
+        if bbox is None: bbox = list(char.bbox)
+        else:
+            bbox[0] = min(bbox[0], char.x0); bbox[1] = min(bbox[1], char.y0)
+            bbox[2] = max(bbox[2], char.x1); bbox[3] = max(bbox[3], char.y1)
+        prev = char
+    if text: lines.append(TextLine("".join(text) + "\n", tuple(bbox)))
+    return [line for line in lines if line.text.strip()]
+
+def iter_pdf_pages(pdf_path, fast_layout=False, page_numbers=None):
+    """
+    (page number, TextLine list) per page, laid out only as the caller asks for the
+    next one: the LTTextContainer boxes of pdfminer's full layout (what extract_pages
+    returns), or raw chars grouped into lines without layout analysis in fast mode.
+    """
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.converter import PDFPageAggregator
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.layout import LAParams, LTTextContainer
+    wanted = set(page_numbers) if page_numbers is not None else None
+    with open(pdf_path, "rb") as fp:
+        resource_manager = PDFResourceManager(caching=True)
+        device = PDFPageAggregator(resource_manager, laparams=None if fast_layout else LAParams())
+        interpreter = PDFPageInterpreter(resource_manager, device)
+        for page_no, page in enumerate(PDFPage.get_pages(fp)):
+            if wanted is not None and page_no not in wanted: continue
+            interpreter.process_page(page)
+            layout = device.get_result()
+            if fast_layout: lines = group_chars_into_lines(iter_layout_chars(layout))
+            else:
+                lines = [TextLine(element.get_text(), tuple(element.bbox))
+                         for element in layout if isinstance(element, LTTextContainer)]
+            device.result = layout = None  # Free the page's layout tree before the caller searches it
+            yield page_no, lines
+
+def extract_fast_lines(pdf_path, page_numbers=(0,)):
+    """ Reads raw chars without layout analysis (laparams=None) and groups them into lines. """
+    lines = []
+    for _, page_lines in iter_pdf_pages(pdf_path, True, page_numbers): lines.extend(page_lines)
+    return lines
+
+def load_pdf_elements(pdf_path, fast_layout=False, page_numbers=(0,)):
+    """ TextLine records of the given pages. """
+    with span("pdf_layout", pdf_path, mode="fast" if fast_layout else "full") as timing:
+        elements = []
+        for _, page_elements in iter_pdf_pages(pdf_path, fast_layout, page_numbers): elements.extend(page_elements)
+        timing["elements"] = len(elements)
+    return elements
+
+# Multi-page reports: pages are read one at a time until every rule is resolved.
+# When at least PAGE_PARALLEL_THRESHOLD pages are left after page 0, the rest
+# are laid out by PAGE_WORKERS processes in small chunks, merged in page order.
+# Only a top-level process does this: batch / watcher / service / UI extractions
+# already run one report per pool worker, which keeps the process count at the
+# pool size and leaves a killed worker nothing to orphan.
+PDF_MAX_PAGES = 50
+PAGE_PARALLEL_THRESHOLD = 4
+PAGE_CHUNK = 2
+PAGE_WORKERS = min(4, os.cpu_count() or 1)
+
+def count_pdf_pages(pdf_path):
+    from pdfminer.pdfpage import PDFPage
+    with open(pdf_path, "rb") as fp:
+        return sum(1 for _ in PDFPage.get_pages(fp))
+
+def layout_pages(pdf_path, page_numbers, fast_layout=False):
+    """ Worker entry: (page number, TextLine list) for each page; plain records pickle cheaply. """
+    return list(iter_pdf_pages(pdf_path, fast_layout, page_numbers))
+
+def scan_pages_parallel(pdf_path, scan, page_numbers, fast_layout):
+    """ Feeds chunks to scan in page order as workers finish them; stops handing out work once scan is done. """
+    chunks = [page_numbers[i:i + PAGE_CHUNK] for i in range(0, len(page_numbers), PAGE_CHUNK)]
+    executor = ProcessPoolExecutor(max_workers=min(PAGE_WORKERS, len(chunks)))
+    try:
+        futures = [executor.submit(layout_pages, pdf_path, chunk, fast_layout) for chunk in chunks]
+        for future in futures:
+            for _, elements in future.result():
+                if scan.add_page(elements): return
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def scan_pdf(pdf_path, rule_set, fast_layout=False, max_pages=PDF_MAX_PAGES, report=None):
+    """
+    Runs rule_set over the report page by page and returns the merged {field: value}.
+    Reports resolved on page 0 cost one page layout, as before multi-page support.
+    """
+    scan = rule_set.scan()
+    mode = "fast" if fast_layout else "full"
+    pages = iter_pdf_pages(pdf_path, fast_layout)
+    page_no, page_count = 0, None
+    while True:
+        with span("pdf_layout", pdf_path, mode=mode, page=page_no) as timing:
+            _, elements = next(pages, (page_no, []))
+            timing["elements"] = len(elements)
+        with span("neighbor_search", pdf_path, report=report, page=page_no, elements=len(elements)):
+            done = scan.add_page(elements)
+        page_no += 1
+        if done: break
+        if page_count is None:
+            page_count = min(count_pdf_pages(pdf_path), max_pages)
+            remaining = list(range(page_no, page_count))
+            # Daemonic workers (multiprocessing.Pool) can't start processes; IsolatedPool workers must not
+            if (PAGE_WORKERS > 1 and len(remaining) >= PAGE_PARALLEL_THRESHOLD
+                    and not multiprocessing.current_process().daemon and not in_pool_worker()):
+                pages.close()
+                with span("pdf_layout", pdf_path, mode=mode, pages=len(remaining), parallel=True):
+                    scan_pages_parallel(pdf_path, scan, remaining, fast_layout)
+                break
+        if page_no >= page_count: break
+    return scan.found
+
+def process_tensile_file(pdf_path, logger=None, fast_layout=False):
     def log(msg):
         if logger: logger(msg)
 
+    missing = (None,) * len(RULES.tensile.rules)
     log(f"--- Scanning Tensile PDF: {os.path.basename(pdf_path)} ---")
-    if not os.path.exists(pdf_path): return None, None, None
-    elements = []
+    if not os.path.exists(pdf_path): return missing
     try:
-        for page_layout in extract_pages(pdf_path, page_numbers=[0]):
-            for element in page_layout:
-                if isinstance(element, LTTextContainer): elements.append(element)
+        found = scan_pdf(pdf_path, RULES.tensile, fast_layout, report="tensile")
     except Exception as e:
         log(f"Error reading Tensile PDF: {e}")
-        return None, None, None
+        return missing
 
-    val_tensile = extract_number_only(find_value_neighbor(elements, "Tensile Strength", "Mpa"))
-    val_yield = extract_number_only(find_value_neighbor(elements, "Yield Strength", "Mpa"))
-    val_elongation = extract_number_only(find_value_neighbor(elements, "Elongation", "%"))
-    
-    log(f"Tensile: {val_tensile}")
-    log(f"Yield: {val_yield}")
-    log(f"Elongation: {val_elongation}")
-    
-    return val_tensile, val_yield, val_elongation
+    for field, value in found.items(): log(f"{field}: {value}")
+    return tuple(found.values())
 
-def process_hardness_file(pdf_path, logger=None):
+def process_hardness_file(pdf_path, logger=None, fast_layout=False):
     def log(msg):
         if logger: logger(msg)
 
     log(f"--- Scanning Hardness PDF: {os.path.basename(pdf_path)} ---")
     if not os.path.exists(pdf_path): return []
-    elements = []
     try:
-        for page_layout in extract_pages(pdf_path, page_numbers=[0]):
-            for element in page_layout:
-                if isinstance(element, LTTextContainer): elements.append(element)
+        found = scan_pdf(pdf_path, RULES.hardness, fast_layout, report="hardness")
     except Exception as e:
         log(f"Error reading Hardness PDF: {e}")
         return []
 
-    hardness_labels = [e for e in elements if "Hardness" in e.get_text()]
-    hardness_labels.sort(key=lambda x: x.bbox[3], reverse=True)
-    
     extracted_values = []
-    count = 1
-    for label in hardness_labels:
-        lx0, ly0, lx1, ly1 = label.bbox
-        label_text = label.get_text().strip()
-        found_val = None
-
-        match_inside = re.search(r"([\d\.]+)\s*HBW", label_text)
-        if match_inside: found_val = match_inside.group(1)
-        
-        if not found_val:
-            closest_dist = 9999
-            for element in elements:
-                etext = element.get_text().strip()
-                ex0, ey0, ex1, ey1 = element.bbox
-                if "HBW" not in etext: continue
-                if (ey0 < ly1 + 5) and (ey1 > ly0 - 5) and (ex0 > lx0):
-                    dist = ex0 - lx1
-                    if dist < closest_dist:
-                        n_match = re.search(r"([\d\.]+)\s*HBW", etext)
-                        if n_match:
-                            closest_dist = dist
-                            found_val = n_match.group(1)
-        if found_val: 
-            extracted_values.append(found_val)
-            log(f"Hardness #{count}: {found_val}")
-            count += 1
+    for values in found.values():
+        if isinstance(values, list): extracted_values.extend(values)
+        elif values and values != LABEL_NOT_FOUND: extracted_values.append(values)
+    for count, value in enumerate(extracted_values, start=1): log(f"Hardness #{count}: {value}")
     return extracted_values
 
-def update_excel_mtc(excel_path, micro_data, tensile_data, hardness_data, logger=None, progress_callback=None):
+def mtc_cell_values(micro_data, tensile_data, hardness_data):
+    """ Ordered (cell, value, description) list of everything an MTC receives (cells come from the rules). """
+    return RULES.cell_values(micro_data, tensile_data, hardness_data)
+
+def write_cells_openpyxl(excel_path, values):
+    import openpyxl
+    with span("workbook_load", excel_path):
+        wb = openpyxl.load_workbook(excel_path)
+    ws = wb.active
+    for cell, value in values.items(): ws[cell] = value
+    with span("workbook_save", excel_path, cells=len(values)):
+        wb.save(excel_path)
+
+def write_cells(excel_path, values, writer="openpyxl", logger=None):
+    """
+    Writes {cell: value} into the active sheet.
+    writer="patch" edits only the sheet XML inside the zip and falls back to
+    openpyxl when the template can't be patched safely. Control characters XML
+    can't hold are dropped first, the same way for both writers.
+    """
+    values = {cell: strip_illegal_chars(value) for cell, value in values.items()}
+    if writer == "patch":
+        try:
+            with span("workbook_patch", excel_path, cells=len(values)):
+                patch_xlsx_cells(excel_path, values)
+            return
+        except XlsxPatchError as e:
+            if logger: logger(f"Patch writer unavailable ({e}); using openpyxl.")
+    write_cells_openpyxl(excel_path, values)
+
+def record_history(excel_path, micro_data, tensile_data, hardness_data, sources, origin=None, logger=None):
+    """
+    Appends the values just written to the MTC history store, keyed by the heat / part
+    parsed from the report names and the reports' content hashes. Never fails the write.
+    """
+    names = [parse_report_name(path) for path in sources.values()]
+    heat = names[0].heat if names else parse_report_name(excel_path).heat
+    part = next((name.part for name in names if name.part), None)
+    try:
+        hashes = {kind: (os.path.basename(path), file_sha256(path) if os.path.exists(path) else None)
+                  for kind, path in sources.items()}
+        MTCHistory().record(heat, part, RULES.field_values(micro_data, tensile_data, hardness_data), hashes,
+                            output=os.path.abspath(excel_path), origin=origin, rules_version=EXTRACTOR_RULES_VERSION)
+    except (OSError, sqlite3.Error) as e:
+        if logger: logger(f"History not recorded: {e}")
+
+def update_excel_mtc(excel_path, micro_data, tensile_data, hardness_data, logger=None, progress_callback=None,
+                     writer="openpyxl", sources=None, origin=None):
+    """
+    Writes the extracted values into the MTC. With sources ({kind: report path}) the
+    values are also appended to the MTC history store, tagged with origin (ui / batch / ...).
+    """
     def log(msg):
         if logger: logger(msg)
     
@@ -201,9 +360,6 @@ def update_excel_mtc(excel_path, micro_data, tensile_data, hardness_data, logger
     update_prog(10)
 
     if not os.path.exists(excel_path): raise FileNotFoundError("Excel file not found")
-    
-    wb = openpyxl.load_workbook(excel_path)
-    ws = wb.active 
 
     # Calculate Total Operations for Progress Bar
     total_ops = 3 + 2 + 6 + 1 # Tensile + Hardness + Micro + Save
@@ -216,48 +372,53 @@ def update_excel_mtc(excel_path, micro_data, tensile_data, hardness_data, logger
         update_prog(percentage)
         log(desc)
 
-    # 1. Tensile
-    val_tensile, val_yield, val_elongation = tensile_data
-    if val_tensile: 
-        ws['E26'] = val_tensile
-        step(f"Set E26 = {val_tensile} (Tensile)")
-    if val_yield:   
-        ws['E27'] = val_yield
-        step(f"Set E27 = {val_yield} (Yield)")
-    if val_elongation: 
-        ws['E28'] = val_elongation
-        step(f"Set E28 = {val_elongation} (Elong)")
-
-    # 2. Hardness
-    if len(hardness_data) > 0: 
-        ws['E29'] = hardness_data[0]
-        step(f"Set E29 = {hardness_data[0]} (BHN 1)")
-    if len(hardness_data) > 1: 
-        ws['E30'] = hardness_data[1]
-        step(f"Set E30 = {hardness_data[1]} (BHN 2)")
-
-    # 3. Micro
-    mapping = {
-        "Graphite Nodularity": 'T36', "Nodular Particles per mm²": 'T37',
-        "Graphite Size": 'T38', "Graphite Form": 'T39',
-        "Graphite Fraction": 'T40', "Ferrite / Pearlite Ratio": 'T41'
-    }
-    for key, cell in mapping.items():
-        if key in micro_data: 
-            ws[cell] = micro_data[key]
-            step(f"Set {cell} = {micro_data[key]} ({key})")
+    values = {}
+    for cell, value, desc in mtc_cell_values(micro_data, tensile_data, hardness_data):
+        values[cell] = value
+        step(f"Set {cell} = {value} ({desc})")
 
     log("Saving Excel file...")
-    wb.save(excel_path)
+    write_cells(excel_path, values, writer, logger=logger)
+    if sources: record_history(excel_path, micro_data, tensile_data, hardness_data, sources, origin, logger)
     update_prog(100)
     log("Excel Saved Successfully.")
 
+def cached_extract(extractor, path, logger=None, bypass_cache=False, **options):
+    """ Runs an extractor through the on-disk result cache; falls back to a plain run if the cache is unusable. """
+    try:
+        cache = ExtractionCache()
+    except (OSError, sqlite3.Error) as e:
+        if logger: logger(f"Cache unavailable: {e}")
+        return extractor(path, logger=logger, **options)
+    return cache.call(extractor, path, EXTRACTOR_RULES_VERSION, logger=logger, bypass=bypass_cache, **options)
+
+def run_extractor(extractor, path, bypass_cache=False):
+    """ Runs one extractor in a worker process, buffering its log lines and timing spans for the UI. """
+    messages = []
+    result, spans = call_with_spans(cached_extract, extractor, path, logger=messages.append,
+                                    bypass_cache=bypass_cache)
+    return result, messages, spans
+
 # ==============================================================================
 # PART 2: THE UI (TKINTER)
 # ==============================================================================
 
+# Seconds one report may take before its worker process is killed
+EXTRACTION_TIMEOUT = DEFAULT_TIMEOUT
+
+# tkinter is bound by load_tk() when the UI starts: the CLI, service, batch and
+# watcher import this module headless (and Python may be built without _tkinter)
+tk = filedialog = ttk = messagebox = scrolledtext = None
+
+def load_tk():
+    global tk, filedialog, ttk, messagebox, scrolledtext
+    import tkinter as tk
+    from tkinter import filedialog, ttk, messagebox, scrolledtext
+    return tk
+
 class MTCApp:
     def __init__(self, root):
+        load_tk()
         self.root = root
         self.root.title("MTC Automation Tool")
         self.root.geometry("900x700") # Increased size for logs
@@ -268,8 +429,22 @@ class MTCApp:
         self.path_tensile = tk.StringVar()
         self.path_hardness = tk.StringVar()
         self.path_excel = tk.StringVar()
+        self.bypass_cache = tk.BooleanVar(value=False)
+        self.use_mirror = tk.BooleanVar(value=True)
+
+        # Worker processes for the three extractors (started on first run, killed on timeout / cancel)
+        self.executor = None
+        self.cancel_requested = threading.Event()
+        # Report folder indexes used to auto-pair documents, keyed by base folder (built off the Tk thread)
+        self.report_indexes = {}
+        self.index_lock = threading.Lock()
+        # Log lines and progress from worker threads; drained every FRAME_MS on the Tk thread
+        self.sink = LogSink(("data", "write"))
 
         self.create_widgets()
+        self.log_widgets = {"data": self.log_data_widget, "write": self.log_write_widget}
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(FRAME_MS, self.drain_logs)
 
     def create_widgets(self):
         # --- Header ---
@@ -285,6 +460,8 @@ class MTCApp:
         self.create_file_row(frame_files, "Hardness Report (.pdf):", self.path_hardness, [("PDF files", "*.pdf")])
         ttk.Separator(frame_files, orient='horizontal').pack(fill='x', pady=5)
         self.create_file_row(frame_files, "MTC Excel File (.xlsx):", self.path_excel, [("Excel files", "*.xlsx")])
+        tk.Checkbutton(frame_files, text="Re-read reports (ignore cache)", variable=self.bypass_cache).pack(anchor="w")
+        tk.Checkbutton(frame_files, text="Copy reports to local disk before reading", variable=self.use_mirror).pack(anchor="w")
 
         # --- Logs Section (Split View) ---
         frame_logs = tk.Frame(self.root)
@@ -322,10 +499,15 @@ class MTCApp:
         self.status_label = tk.Label(self.root, text="Ready", fg="gray")
         self.status_label.pack()
 
-        # Run Button
-        self.btn_run = tk.Button(self.root, text="START EXTRACTION", command=self.start_thread, 
+        # Run / Cancel Buttons
+        frame_buttons = tk.Frame(self.root)
+        frame_buttons.pack(pady=10)
+        self.btn_run = tk.Button(frame_buttons, text="START EXTRACTION", command=self.start_thread, 
                                  bg="#4CAF50", fg="white", font=("Arial", 12, "bold"), height=2, width=20)
-        self.btn_run.pack(pady=10)
+        self.btn_run.pack(side="left", padx=5)
+        self.btn_cancel = tk.Button(frame_buttons, text="CANCEL", command=self.cancel_run, state="disabled",
+                                    bg="#E53935", fg="white", font=("Arial", 12, "bold"), height=2, width=10)
+        self.btn_cancel.pack(side="left", padx=5)
 
     def create_file_row(self, parent, label_text, variable, file_types):
         row_frame = tk.Frame(parent)
@@ -336,23 +518,64 @@ class MTCApp:
 
     def browse_file(self, variable, file_types):
         filename = filedialog.askopenfilename(filetypes=file_types)
-        if filename: variable.set(filename)
+        if filename:
+            variable.set(filename)
+            if variable is not self.path_excel:
+                # Scanning the share folders can take seconds on SMB; keep it off the Tk thread
+                threading.Thread(target=self.auto_pair, args=(filename,), daemon=True).start()
+
+    def auto_pair(self, filename):
+        """
+        Worker thread: finds the same heat's (and part's) files in the sibling report folders and
+        hands them to the UI through the sink; fill_paired() applies them on the Tk thread.
+        """
+        base = os.path.dirname(os.path.dirname(filename))
+        try:
+            with self.index_lock:
+                index = self.report_indexes.get(base)
+                if index is None: index = self.report_indexes[base] = ReportIndex.for_base(base)
+                else: index.refresh()
+                reports = index.pair_for(filename)
+        except OSError as e:
+            self.log_data(f"[AUTO] Report folders not scanned: {e}")
+            return
+        self.sink.set("paired", reports)
+
+    def fill_paired(self, reports):
+        """ Fills the report fields that are still empty with the auto-paired files. """
+        for kind, variable in (("micro", self.path_micro), ("tensile", self.path_tensile), ("hardness", self.path_hardness)):
+            if not variable.get() and kind in reports:
+                variable.set(reports[kind])
+                self.log_data(f"[AUTO] {kind}: {os.path.basename(reports[kind])}")
 
     # --- Logger Helpers ---
     def log_data(self, message):
-        self.root.after(0, lambda: self._append_log(self.log_data_widget, message))
+        self.sink.write("data", message)
 
     def log_write(self, message):
-        self.root.after(0, lambda: self._append_log(self.log_write_widget, message))
+        self.sink.write("write", message)
 
-    def _append_log(self, widget, message):
+    def _append_log(self, widget, lines, dropped=0):
+        """ One insert per pane per frame; the pane keeps the last sink.max_lines lines. """
         widget.config(state='normal')
-        widget.insert(tk.END, message + "\n")
+        if dropped: widget.insert(tk.END, f"... {dropped} lines skipped (full log: {self.sink.spool_path})\n")
+        widget.insert(tk.END, "\n".join(lines) + "\n")
+        excess = int(widget.index("end-1c").split(".")[0]) - 1 - self.sink.max_lines
+        if excess > 0: widget.delete("1.0", f"{excess + 1}.0")
         widget.see(tk.END) # Auto scroll
         widget.config(state='disabled')
 
+    def drain_logs(self):
+        batches, dropped, values = self.sink.drain()
+        for pane, lines in batches.items(): self._append_log(self.log_widgets[pane], lines, dropped.get(pane, 0))
+        if "status" in values: self.status_label.config(text=values["status"])
+        if "paired" in values: self.fill_paired(values["paired"])
+        if "progress_main" in values: self.progress_main.configure(value=values["progress_main"])
+        if "progress_write" in values: self.progress_write.configure(value=values["progress_write"])
+        self.root.after(FRAME_MS, self.drain_logs)
+
     def update_write_progress(self, value):
-        self.root.after(0, lambda: self.progress_write.configure(value=value))
+        self.sink.set("progress_write", value)
 
     # --- Threading & Execution ---
     def start_thread(self):
@@ -361,28 +584,136 @@ class MTCApp:
             return
 
         self.btn_run.config(state="disabled", text="Processing...")
+        self.btn_cancel.config(state="normal")
+        self.cancel_requested.clear()
         
         # Clear logs
+        self.sink.clear()
+        spool_path = self.sink.start_spool()
         self.log_data_widget.config(state='normal'); self.log_data_widget.delete(1.0, tk.END); self.log_data_widget.config(state='disabled')
         self.log_write_widget.config(state='normal'); self.log_write_widget.delete(1.0, tk.END); self.log_write_widget.config(state='disabled')
         self.progress_main['value'] = 0
         self.progress_write['value'] = 0
+        if spool_path: self.log_write(f"Full log: {spool_path}")
 
         threading.Thread(target=self.run_process, daemon=True).start()
 
+    def cancel_run(self):
+        """ Kills the running extractions; the run ends as 'Cancelled' without writing the MTC. """
+        self.cancel_requested.set()
+        if self.executor: self.executor.cancel_all()
+        self.btn_cancel.config(state="disabled")
+        self.log_data("Cancelling...")
+
+    def get_executor(self):
+        if self.executor is None:
+            self.executor = IsolatedPool(max_workers=3, timeout=EXTRACTION_TIMEOUT)
+        return self.executor
+
+    def get_service(self):
+        """
+        Client for the resident MTC_Service, only when $MTC_SERVICE_URL is set and the
+        service there proves this user's token; otherwise the reports are read locally.
+        """
+        url = os.environ.get("MTC_SERVICE_URL")
+        if not url: return None
+        from MTC_Service import ServiceClient, ServiceError
+        client = ServiceClient(url)
+        try:
+            client.request("GET", "/health", timeout=2)
+        except ServiceError as e:
+            self.log_data(f"Service at {url} not used ({e}); reading locally.")
+            return None
+        return client
+
+    def extract_locally(self, paths):
+        executor = self.get_executor()
+        bypass = self.bypass_cache.get()
+        extractors = (("Microstructure", extract_micro_data_from_docx), ("Tensile", process_tensile_file),
+                      ("Hardness", process_hardness_file))
+        jobs = {executor.submit(run_extractor, extractor, path, bypass): (name, path)
+                for (name, extractor), path in zip(extractors, paths)}
+        results = {}
+        for done, future in enumerate(as_completed(jobs), start=1):
+            name, path = jobs[future]
+            try:
+                results[name], messages, spans = future.result()
+            except (ExtractionTimeout, WorkerDied) as e:
+                executor.cancel_all()  # No MTC without all three reports; free the other workers
+                raise RuntimeError(f"{name} report {os.path.basename(path)}: extraction {e}")
+            TIMINGS.extend(spans)
+            for message in messages: self.log_data(message)
+            self.update_status(f"{name} done ({done}/3)", 5 + done * 25)
+        return results
+
+    def extract_with_service(self, service, paths):
+        """ Same three extractions as extract_locally, queued on the resident service's warm workers. """
+        from MTC_CLI import tensile_tuple
+        self.log_data(f"Using resident service at {service.url}")
+        cache_flags = ["--refresh-cache"] if self.bypass_cache.get() else []
+        jobs = [
+            ("Microstructure", service.submit(["extract-docx", paths[0]] + cache_flags)),
+            ("Tensile", service.submit(["extract-pdf", "--kind", "tensile", paths[1]] + cache_flags)),
+            ("Hardness", service.submit(["extract-pdf", "--kind", "hardness", paths[2]] + cache_flags)),
+        ]
+        results = {}
+        for done, (name, job) in enumerate(jobs, start=1):
+            while job.get("state") != "done":
+                if self.cancel_requested.is_set():
+                    self.cancel_service_jobs(service, [pending["id"] for _, pending in jobs[done - 1:]])
+                    raise ExtractionCancelled("Cancelled")
+                job = service.job(job["id"], wait=1)
+            for message in job.get("log", []): self.log_data(message)
+            output = job["output"]
+            if not output.get("ok"): raise RuntimeError(f"{name} extraction failed: {output.get('error')}")
+            values = output["results"][0]
+            if name == "Microstructure": results[name] = values["micro"]
+            elif name == "Tensile": results[name] = tensile_tuple(values["tensile"])
+            else: results[name] = values["hardness"]
+            self.log_data(f"{name}: {job['latency_ms']['total']:.0f} ms on the service")
+            self.update_status(f"{name} done ({done}/3)", 5 + done * 25)
+        return results
+
+    def cancel_service_jobs(self, service, job_ids):
+        """ Stops jobs still queued or running on the service (their workers are killed there). """
+        from MTC_Service import ServiceError
+        for job_id in job_ids:
+            try:
+                service.cancel(job_id)
+            except ServiceError as e:
+                self.log_data(f"Service job {job_id} not cancelled: {e}")
+
+    def on_close(self):
+        if self.executor: self.executor.shutdown(wait=False, cancel_futures=True)
+        self.sink.close()
+        self.root.destroy()
+
+    def mirror_reports(self, paths):
+        """ Local copies of the selected reports (missing files are left for the extractors to report). """
+        stats = new_stats()
+        start = time.perf_counter()
+        local = [sync_file(path, stats=stats) if os.path.exists(path) else path for path in paths]
+        stats["seconds"] = round(time.perf_counter() - start, 2)
+        self.log_data(format_stats(stats))
+        return local
+
     def run_process(self):
         try:
-            # 1. Micro
-            self.update_status("Reading Microstructure...", 5)
-            micro_data = extract_micro_data_from_docx(self.path_micro.get(), logger=self.log_data)
-            
-            # 2. Tensile
-            self.update_status("Reading Tensile...", 30)
-            tensile_data = process_tensile_file(self.path_tensile.get(), logger=self.log_data)
-            
-            # 3. Hardness
-            self.update_status("Reading Hardness...", 60)
-            hardness_data = process_hardness_file(self.path_hardness.get(), logger=self.log_data)
+            # 1-3. Micro, Tensile and Hardness run side by side; join before writing
+            paths = [self.path_micro.get(), self.path_tensile.get(), self.path_hardness.get()]
+            if self.use_mirror.get():
+                self.update_status("Copying reports to local disk...", 2)
+                paths = self.mirror_reports(paths)
+
+            self.update_status("Reading Micro, Tensile & Hardness...", 5)
+            service = self.get_service()
+            if service: results = self.extract_with_service(service, paths)
+            else: results = self.extract_locally(paths)
+
+            if self.cancel_requested.is_set(): raise ExtractionCancelled("Cancelled")
+            micro_data = results["Microstructure"]
+            tensile_data = results["Tensile"]
+            hardness_data = results["Hardness"]
             
             # 4. Writing
             self.update_status("Writing to Excel...", 85)
@@ -392,29 +723,36 @@ class MTCApp:
                 tensile_data, 
                 hardness_data, 
                 logger=self.log_write, 
-                progress_callback=self.update_write_progress
+                progress_callback=self.update_write_progress,
+                sources=dict(zip(("micro", "tensile", "hardness"), paths)),
+                origin="ui"
             )
             
+            export_timings(logger=self.log_write)
             self.update_status("Completed!", 100)
             messagebox.showinfo("Success", "Process Completed Successfully!")
             
+        except ExtractionCancelled:
+            self.log_data("Cancelled; the MTC was not written.")
+            self.update_status("Cancelled", 0)
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred:\n{str(e)}")
             self.log_data(f"ERROR: {str(e)}")
             self.update_status("Error", 0)
         finally:
             self.root.after(0, lambda: self.btn_run.config(state="normal", text="START EXTRACTION"))
+            self.root.after(0, lambda: self.btn_cancel.config(state="disabled"))
 
     def update_status(self, text, progress_val):
-        self.root.after(0, lambda: self.status_label.config(text=text))
-        self.root.after(0, lambda: self.progress_main.configure(value=progress_val))
+        self.sink.set("status", text)
+        self.sink.set("progress_main", progress_val)
 
 # ==============================================================================
 # MAIN ENTRY POINT
 # ==============================================================================
 
 if __name__ == "__main__":
-    root = tk.Tk()
+    root = load_tk().Tk()
     
     app = MTCApp(root)
     root.mainloop()
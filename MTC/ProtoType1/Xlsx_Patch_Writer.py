@@ -0,0 +1,138 @@
+# ==============================================================================
+# XLSX PATCH WRITER
+# Writes a handful of cell values straight into the active sheet's XML inside
+# the xlsx zip. Every other zip member (styles, drawings, logos, signatures) is
+# re-stored with the same content and compression method (zipfile inflates and
+# deflates it again), so there is no full workbook load/save.
+# ==============================================================================
+
+import os
+import re
+import math
+import zipfile
+import tempfile
+import posixpath
+from xml.sax.saxutils import escape
+
+CELL_REF_PATTERN = re.compile(r"^([A-Z]+)(\d+)$")
+# Control characters XML 1.0 forbids (same set openpyxl rejects with IllegalCharacterError)
+ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class XlsxPatchError(Exception):
+    """ The workbook has a layout this writer does not handle; use openpyxl instead. """
+
+
+def strip_illegal_chars(value):
+    """ Text values without XML-illegal control characters (PDF text can carry e.g. \\x0b); others unchanged. """
+    return ILLEGAL_XML_CHARS.sub("", value) if isinstance(value, str) else value
+
+
+def column_number(letters):
+    number = 0
+    for ch in letters: number = number * 26 + (ord(ch) - 64)
+    return number
+
+
+def split_ref(ref):
+    match = CELL_REF_PATTERN.match(ref.upper())
+    if not match: raise XlsxPatchError(f"Bad cell reference: {ref}")
+    return match.group(1), int(match.group(2))
+
+
+def active_sheet_path(xlsx):
+    """ Zip path of the sheet openpyxl would return as wb.active. """
+    workbook_xml = xlsx.read("xl/workbook.xml").decode("utf-8")
+    rels_xml = xlsx.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+
+    tab = re.search(r"<workbookView\b[^>]*?\bactiveTab=\"(\d+)\"", workbook_xml)
+    sheets = re.findall(r"<sheet\b[^>]*?/>", workbook_xml)
+    if not sheets: raise XlsxPatchError("No sheets found in workbook.xml")
+    index = int(tab.group(1)) if tab else 0
+    if index >= len(sheets): index = 0
+
+    rel_id = re.search(r"\br:id=\"([^\"]+)\"", sheets[index]) or re.search(r":id=\"([^\"]+)\"", sheets[index])
+    if not rel_id: raise XlsxPatchError("Sheet has no relationship id")
+    for rel in re.findall(r"<Relationship\b[^>]*?/>", rels_xml):
+        if f'Id="{rel_id.group(1)}"' in rel:
+            target = re.search(r"\bTarget=\"([^\"]+)\"", rel).group(1)
+            if target.startswith("/"): return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+    raise XlsxPatchError("Active sheet relationship not found")
+
+
+def cell_xml(ref, value, style):
+    """ Number cell for int/float values, inline-string cell for everything else (as openpyxl stores them). """
+    style_attr = f' s="{style}"' if style else ""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if not math.isfinite(value): raise XlsxPatchError(f"{ref} value is not a finite number")
+        return f'<c r="{ref}"{style_attr}><v>{value!r}</v></c>'
+    text = str(value)
+    if ILLEGAL_XML_CHARS.search(text): raise XlsxPatchError(f"{ref} value contains characters XML does not allow")
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t{space}>{escape(text)}</t></is></c>'
+
+
+def patch_row(row_body, ref, value):
+    """ Returns the row body with cell ref replaced or inserted in column order. """
+    found = re.search(r'<c\b[^>]*?\br="%s"[^>]*?(?:/>|>.*?</c>)' % ref, row_body, re.DOTALL)
+    if found:
+        old = found.group(0)
+        if "<f" in old: raise XlsxPatchError(f"{ref} holds a formula")
+        style = re.search(r'\bs="(\d+)"', old[:old.index(">")])
+        return row_body[:found.start()] + cell_xml(ref, value, style.group(1) if style else None) + row_body[found.end():]
+
+    target_col = column_number(split_ref(ref)[0])
+    for cell in re.finditer(r'<c\b[^>]*?\br="([A-Z]+)\d+"', row_body):
+        if column_number(cell.group(1)) > target_col:
+            return row_body[:cell.start()] + cell_xml(ref, value, None) + row_body[cell.start():]
+    return row_body + cell_xml(ref, value, None)
+
+
+def patch_sheet_xml(sheet_xml, values):
+    """ Applies {cell_ref: value} to worksheet XML text. """
+    if "<sheetData" not in sheet_xml: raise XlsxPatchError("Prefixed or missing sheetData")
+    sheet_xml = re.sub(r"<sheetData\s*/>", "<sheetData></sheetData>", sheet_xml, count=1)
+
+    for ref, value in values.items():
+        ref = ref.upper()
+        row_num = split_ref(ref)[1]
+        row = re.search(r'<row\b[^>]*?\br="%d"[^>]*?(/>|>(.*?)</row>)' % row_num, sheet_xml, re.DOTALL)
+        if row:
+            open_tag = sheet_xml[row.start():row.start(1)]
+            body = row.group(2) if row.group(1) != "/>" else ""
+            new_row = f"{open_tag}>{patch_row(body, ref, value)}</row>"
+            sheet_xml = sheet_xml[:row.start()] + new_row + sheet_xml[row.end():]
+            continue
+
+        new_row = f'<row r="{row_num}">{cell_xml(ref, value, None)}</row>'
+        insert_at = sheet_xml.index("</sheetData>")
+        for later in re.finditer(r'<row\b[^>]*?\br="(\d+)"', sheet_xml):
+            if int(later.group(1)) > row_num:
+                insert_at = later.start(); break
+        sheet_xml = sheet_xml[:insert_at] + new_row + sheet_xml[insert_at:]
+    return sheet_xml
+
+
+def patch_xlsx_cells(xlsx_path, values, output_path=None):
+    """
+    Writes {cell_ref: value} into the active sheet of xlsx_path (in place unless
+    output_path is given). Raises XlsxPatchError when the sheet can't be patched safely.
+    """
+    output_path = output_path or xlsx_path
+    with zipfile.ZipFile(xlsx_path) as src:
+        sheet_path = active_sheet_path(src)
+        sheet_xml = src.read(sheet_path).decode("utf-8")
+        patched = patch_sheet_xml(sheet_xml, values).encode("utf-8")
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(output_path)))
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_path, "w") as dst:
+                for info in src.infolist():
+                    data = patched if info.filename == sheet_path else src.read(info)
+                    dst.writestr(info, data, compress_type=info.compress_type)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+            raise
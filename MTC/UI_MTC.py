@@ -2,188 +2,18 @@ import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 import threading
 import os
-import re
-import zipfile
-import xml.etree.ElementTree as ET
-import openpyxl
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer
-
-# ==============================================================================
-# PART 1: BACKEND LOGIC (Your Existing Extraction Code)
-# ==============================================================================
-
-def extract_micro_data_from_docx(docx_path):
-    results = {}
-    try:
-        if not os.path.exists(docx_path): return results
-        with zipfile.ZipFile(docx_path) as docx:
-            xml_content = docx.read('word/document.xml')
-    except Exception as e:
-        print(f"Error reading DOCX: {e}")
-        return results
-
-    tree = ET.fromstring(xml_content)
-    all_text_chunks = []
-    for elem in tree.iter():
-        if elem.tag.endswith('}t'):
-            if elem.text and elem.text.strip():
-                all_text_chunks.append(elem.text.strip())
-
-    target_labels = {
-        "Graphite Nodularity": "last", "Nodular Particles per mm²": "last",
-        "Graphite Size": "last", "Graphite Form": "last",
-        "Graphite Fraction": "last", "Ferrite / Pearlite Ratio": "first"
-    }
-    
-    for label, preference in target_labels.items():
-        target_index = -1
-        found_value = None
-        
-        # Search strategy
-        if preference == "last":
-            for i, chunk in enumerate(all_text_chunks):
-                if label.lower() in chunk.lower(): target_index = i
-        elif preference == "first":
-            for i, chunk in enumerate(all_text_chunks):
-                if label.lower() in chunk.lower(): 
-                    target_index = i
-                    break
-
-        if target_index != -1:
-            neighbors = all_text_chunks[target_index+1:target_index+6]
-            # Extraction Logic
-            if label == "Graphite Fraction":
-                for j, n in enumerate(neighbors):
-                    if "%" in n and any(c.isdigit() for c in n):
-                        found_value = n; break
-                    if any(c.isdigit() for c in n) and j+1 < len(neighbors) and neighbors[j+1] == "%":
-                        found_value = f"{n}{neighbors[j+1]}"; break
-            elif label == "Graphite Form":
-                for n in neighbors:
-                     if "(" in n and ")" in n: found_value = n; break
-            elif label == "Ferrite / Pearlite Ratio":
-                combined = "".join(neighbors[0:3])
-                match = re.search(r"(\d+\.?\d*%\s*/\s*\d+\.?\d*%)", combined)
-                if match: found_value = match.group(1)
-            elif label == "Graphite Nodularity":
-                for n in neighbors:
-                    if "%" in n and len(n) > 1: found_value = n; break
-            elif label in ["Nodular Particles per mm²", "Graphite Size"]:
-                for n in neighbors:
-                    if any(c.isdigit() for c in n) and not n.endswith('%'):
-                        found_value = re.sub(r'[\s\.\,]+$', '', n); break
-            
-            if found_value: results[label] = found_value
-    return results
-
-def find_value_neighbor(elements, label_text, required_keyword="Mpa"):
-    label_bbox = None
-    for element in elements:
-        if label_text in element.get_text():
-            label_bbox = element.bbox; break    
-    if not label_bbox: return "Label Not Found"
-
-    lx0, ly0, lx1, ly1 = label_bbox
-    best_candidate_text = None
-    closest_distance = 9999
-    
-    for element in elements:
-        text = element.get_text().strip()
-        ex0, ey0, ex1, ey1 = element.bbox
-        if label_text in text: continue
-        
-        if (ey0 < ly1 + 2) and (ey1 > ly0 - 2) and (ex0 >= lx0 - 5) and (required_keyword in text):
-            distance = ex0 - lx1
-            if distance < closest_distance:
-                closest_distance = distance
-                best_candidate_text = text
-    return best_candidate_text
-
-def extract_number_only(text):
-    if not text: return None
-    match = re.search(r"([\d\.]+)", text)
-    if match: return match.group(1)
-    return text
-
-def process_tensile_file(pdf_path):
-    if not os.path.exists(pdf_path): return None, None, None
-    elements = []
-    try:
-        for page_layout in extract_pages(pdf_path, page_numbers=[0]):
-            for element in page_layout:
-                if isinstance(element, LTTextContainer): elements.append(element)
-    except Exception as e:
-        print(f"Error reading Tensile PDF: {e}")
-        return None, None, None
-
-    val_tensile = extract_number_only(find_value_neighbor(elements, "Tensile Strength", "Mpa"))
-    val_yield = extract_number_only(find_value_neighbor(elements, "Yield Strength", "Mpa"))
-    val_elongation = extract_number_only(find_value_neighbor(elements, "Elongation", "%"))
-    return val_tensile, val_yield, val_elongation
-
-def process_hardness_file(pdf_path):
-    if not os.path.exists(pdf_path): return []
-    elements = []
-    try:
-        for page_layout in extract_pages(pdf_path, page_numbers=[0]):
-            for element in page_layout:
-                if isinstance(element, LTTextContainer): elements.append(element)
-    except Exception as e:
-        print(f"Error reading Hardness PDF: {e}")
-        return []
-
-    hardness_labels = [e for e in elements if "Hardness" in e.get_text()]
-    hardness_labels.sort(key=lambda x: x.bbox[3], reverse=True)
-    
-    extracted_values = []
-    for label in hardness_labels:
-        lx0, ly0, lx1, ly1 = label.bbox
-        label_text = label.get_text().strip()
-        found_val = None
-
-        match_inside = re.search(r"([\d\.]+)\s*HBW", label_text)
-        if match_inside: found_val = match_inside.group(1)
-        
-        if not found_val:
-            closest_dist = 9999
-            for element in elements:
-                etext = element.get_text().strip()
-                ex0, ey0, ex1, ey1 = element.bbox
-                if "HBW" not in etext: continue
-                if (ey0 < ly1 + 5) and (ey1 > ly0 - 5) and (ex0 > lx0):
-                    dist = ex0 - lx1
-                    if dist < closest_dist:
-                        n_match = re.search(r"([\d\.]+)\s*HBW", etext)
-                        if n_match:
-                            closest_dist = dist
-                            found_val = n_match.group(1)
-        if found_val: extracted_values.append(found_val)
-    return extracted_values
-
-def update_excel_mtc(excel_path, micro_data, tensile_data, hardness_data):
-    if not os.path.exists(excel_path): raise FileNotFoundError("Excel file not found")
-    
-    wb = openpyxl.load_workbook(excel_path)
-    ws = wb.active 
-
-    val_tensile, val_yield, val_elongation = tensile_data
-    if val_tensile: ws['E26'] = val_tensile
-    if val_yield:   ws['E27'] = val_yield
-    if val_elongation: ws['E28'] = val_elongation
-
-    if len(hardness_data) > 0: ws['E29'] = hardness_data[0]
-    if len(hardness_data) > 1: ws['E30'] = hardness_data[1]
-
-    mapping = {
-        "Graphite Nodularity": 'T36', "Nodular Particles per mm²": 'T37',
-        "Graphite Size": 'T38', "Graphite Form": 'T39',
-        "Graphite Fraction": 'T40', "Ferrite / Pearlite Ratio": 'T41'
-    }
-    for key, cell in mapping.items():
-        if key in micro_data: ws[cell] = micro_data[key]
-
-    wb.save(excel_path)
+import sys
+
+# The extraction engine lives in ProtoType1 (Extraction_Rules via Working); this
+# UI only keeps its own window on top of it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "ProtoType1"))
+from Working import (
+    cached_extract,
+    extract_micro_data_from_docx,
+    process_tensile_file,
+    process_hardness_file,
+    update_excel_mtc,
+)
 
 # ==============================================================================
 # PART 2: THE UI (TKINTER)
@@ -279,15 +109,15 @@ class MTCApp:
         try:
             # 0%
             self.update_status("Reading Microstructure Report...", 5)
-            micro_data = extract_micro_data_from_docx(self.path_micro.get())
+            micro_data = cached_extract(extract_micro_data_from_docx, self.path_micro.get())
             
             # 30%
             self.update_status("Reading Tensile Report...", 30)
-            tensile_data = process_tensile_file(self.path_tensile.get())
+            tensile_data = cached_extract(process_tensile_file, self.path_tensile.get())
             
             # 60%
             self.update_status("Reading Hardness Report...", 60)
-            hardness_data = process_hardness_file(self.path_hardness.get())
+            hardness_data = cached_extract(process_hardness_file, self.path_hardness.get())
             
             # 85%
             self.update_status("Writing to Excel...", 85)